@@ -0,0 +1,137 @@
+
+import os, uuid, hashlib, threading
+from collections import OrderedDict
+from typing import AsyncIterator, BinaryIO, Callable, Optional
+
+from .caching import CacheCounters, process_wide
+
+AUDIO_CACHE_ENABLED = os.getenv("AUDIO_CACHE_ENABLED", "1").lower() not in ("0", "false", "no")
+AUDIO_CACHE_DIR = os.getenv("AUDIO_CACHE_DIR", ".cache/tts")
+AUDIO_CACHE_MAX_BYTES = int(os.getenv("AUDIO_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+def audio_cache_key(text: str, model: str, voice: str, fmt: str) -> str:
+    """Content address of one synthesis: the (Markdown-stripped) text and everything that changes its audio."""
+    return hashlib.sha256("\0".join([text, model, voice, fmt]).encode("utf-8")).hexdigest()
+
+class AudioCache(CacheCounters):
+    """
+    Synthesized audio files on disk, evicted least-recently-used once they exceed `max_bytes`.
+    The directory may be shared by several workers: a lookup adopts files another worker wrote,
+    hits touch the file's mtime, and every write rescans the directory and evicts by mtime, so
+    `max_bytes` bounds the directory rather than one worker's share of it.
+    """
+
+    def __init__(self, directory: str = AUDIO_CACHE_DIR, max_bytes: int = AUDIO_CACHE_MAX_BYTES):
+        super().__init__()
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._sizes: "OrderedDict[str, int]" = OrderedDict()  # file name -> bytes, oldest access first
+        self.bytes = 0
+        self._scan()
+        self._evict()
+
+    def _scan(self) -> None:
+        """Rebuild the index from the directory, oldest mtime first (picks up other workers' files)."""
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and not entry.name.endswith(".part"):
+                try:
+                    st = entry.stat()
+                except OSError:  # evicted by another worker meanwhile
+                    continue
+                files.append((st.st_mtime_ns, entry.name, st.st_size))
+        self._sizes = OrderedDict((name, size) for _, name, size in sorted(files))
+        self.bytes = sum(self._sizes.values())
+
+    def _name(self, key: str, ext: str) -> str:
+        return f"{key}.{ext}"
+
+    def lookup(self, key: str, ext: str) -> Optional[str]:
+        """Path of the cached file, marked as recently used, or None."""
+        name = self._name(key, ext)
+        path = os.path.join(self.directory, name)
+        with self._lock:
+            try:
+                size = os.stat(path).st_size  # the file may come from another worker, or be gone
+            except OSError:
+                self.bytes -= self._sizes.pop(name, 0)
+                self.misses += 1
+                return None
+            self.bytes += size - self._sizes.pop(name, 0)
+            self._sizes[name] = size
+            self.hits += 1
+        try:
+            os.utime(path)  # keeps LRU order across restarts
+        except OSError:
+            pass
+        return path
+
+    def read(self, key: str, ext: str) -> Optional[bytes]:
+        path = self.lookup(key, ext)
+        if path is None:
+            return None
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def store(self, key: str, ext: str, data: bytes) -> None:
+        name = self._name(key, ext)
+        final = os.path.join(self.directory, name)
+        tmp = f"{final}.{uuid.uuid4().hex}.part"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, final)
+        with self._lock:
+            self._scan()
+            self._evict()
+
+    async def tee(
+        self, key: str, ext: str, chunks: AsyncIterator[bytes],
+        finalize: Optional[Callable[[BinaryIO, int], None]] = None,
+    ) -> AsyncIterator[bytes]:
+        """
+        Pass `chunks` through while writing them to the cache; only complete streams are stored.
+        `finalize(file, size)` may rewrite the file (e.g. header sizes unknown while streaming) before it is.
+        """
+        name = self._name(key, ext)
+        final = os.path.join(self.directory, name)
+        tmp = f"{final}.{uuid.uuid4().hex}.part"
+        size = 0
+        f = open(tmp, "wb")
+        try:
+            async for chunk in chunks:
+                f.write(chunk)
+                size += len(chunk)
+                yield chunk
+            if finalize is not None:
+                finalize(f, size)
+            f.close()
+            os.replace(tmp, final)
+        finally:
+            if not f.closed:
+                f.close()
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        with self._lock:
+            self._scan()
+            self._evict()
+
+    def _evict(self) -> None:
+        while self.bytes > self.max_bytes and self._sizes:
+            name, size = self._sizes.popitem(last=False)
+            self.bytes -= size
+            self.evictions += 1
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+
+    def stats(self) -> dict:
+        return super().stats(files=len(self._sizes), bytes=self.bytes, max_bytes=self.max_bytes)
+
+# process-wide cache, opened on first use; None when AUDIO_CACHE_ENABLED is off
+get_audio_cache = process_wide(AUDIO_CACHE_ENABLED, AudioCache)
@@ -0,0 +1,99 @@
+import os, time, sqlite3, threading
+from typing import Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+class CacheCounters:
+    """Hit, miss and eviction counts of one cache, reported together with its hit ratio."""
+
+    def __init__(self):
+        self.hits = self.misses = self.evictions = 0
+
+    def stats(self, **fields) -> dict:
+        """`fields` (size, limits, ...) followed by the counts."""
+        lookups = self.hits + self.misses
+        return {
+            **fields, "hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+def process_wide(enabled: bool, open_cache: Callable[[], T]) -> Callable[[], Optional[T]]:
+    """Getter of one instance per process, opened on first call; it returns None when `enabled` is false."""
+    instance: Optional[T] = None
+    lock = threading.Lock()
+
+    def get() -> Optional[T]:
+        nonlocal instance
+        if not enabled:
+            return None
+        if instance is None:
+            with lock:
+                if instance is None:
+                    instance = open_cache()
+        return instance
+    return get
+
+class SqliteLRU(CacheCounters):
+    """
+    Text values by key in one SQLite table, dropped least-recently-used beyond `max_entries` and
+    `ttl_s` seconds after they were written. Safe to share across threads; processes opening the
+    same file (WAL) see each other's entries. The entry count is this process's view.
+    """
+
+    def __init__(self, path: str, table: str, max_entries: int, ttl_s: float):
+        super().__init__()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.table = table
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            " key TEXT PRIMARY KEY, text TEXT NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._db.execute(f"CREATE INDEX IF NOT EXISTS {table}_accessed ON {table} (accessed)")
+        self._count = self._db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(f"SELECT text, created FROM {self.table} WHERE key = ?", (key,)).fetchone()
+            if row is not None and now - row[1] > self.ttl_s:
+                self._db.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                self._count -= 1
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._db.execute(f"UPDATE {self.table} SET accessed = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, text: str) -> None:
+        now = time.time()
+        with self._lock:
+            cur = self._db.execute(
+                f"INSERT OR IGNORE INTO {self.table} (key, text, created, accessed) VALUES (?, ?, ?, ?)",
+                (key, text, now, now),
+            )
+            if cur.rowcount == 0:
+                self._db.execute(
+                    f"UPDATE {self.table} SET text = ?, created = ?, accessed = ? WHERE key = ?", (text, now, now, key)
+                )
+                return
+            self._count += 1
+            if self._count > self.max_entries:
+                # evict in batches (10%) so a full cache doesn't pay a DELETE on every insert
+                n = self._count - self.max_entries + max(1, self.max_entries // 10)
+                cur = self._db.execute(
+                    f"DELETE FROM {self.table} WHERE key IN (SELECT key FROM {self.table} ORDER BY accessed LIMIT ?)", (n,)
+                )
+                self._count -= cur.rowcount
+                self.evictions += cur.rowcount
+
+    def stats(self, **fields) -> dict:
+        return super().stats(entries=self._count, max_entries=self.max_entries, ttl_s=self.ttl_s, **fields)
@@ -0,0 +1,172 @@
+
+"""
+Content-Encoding both ways, as ASGI middleware in front of the app.
+
+Requests: a gzip or zstd body (Content-Encoding: gzip, x-gzip, zstd, or several of them in the order
+they were applied) is decompressed before the app reads it, up to BODY_MAX_BYTES; over that is a 413,
+a body that doesn't decompress a 400, an unknown coding a 415.
+
+Responses: whole JSON / MessagePack / CBOR bodies of at least COMPRESS_MIN_BYTES are compressed with
+zstd or gzip, whichever the client's Accept-Encoding prefers (zstd at equal q). Streamed responses
+(audio, SSE) pass through untouched, so their first bytes are never held back.
+"""
+import os, zlib
+from typing import Callable, List, Optional
+
+import zstandard
+from fastapi.responses import ORJSONResponse
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .media_types import CBOR, JSON, MSGPACK, parse_media_type, q_value
+
+BODY_MAX_BYTES = int(os.getenv("BODY_MAX_BYTES", str(256 * 2**20)))  # per request body, after decompression
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "1024"))  # smaller responses go out as they are
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+ZSTD_LEVEL = int(os.getenv("ZSTD_LEVEL", "3"))
+
+COMPRESSIBLE = (JSON, MSGPACK, CBOR)
+
+# incremental decoders: .decompress(), .eof, .unused_data (the start of the next gzip member / zstd frame)
+_DECODERS: dict = {
+    "gzip": lambda: zlib.decompressobj(wbits=31),
+    "x-gzip": lambda: zlib.decompressobj(wbits=31),
+    "zstd": lambda: zstandard.ZstdDecompressor().decompressobj(),
+}
+_PIECE = 1024  # compressed bytes fed at a time: bounds what one call can expand to before the size check
+
+def decompress(raw: bytes, coding: str, limit: int = BODY_MAX_BYTES) -> bytes:
+    """
+    `raw` decoded from one content coding. LookupError for an unknown coding, ValueError for data
+    that isn't complete and well-formed, OverflowError past `limit` decompressed bytes.
+    """
+    new = _DECODERS.get(coding)
+    if new is None:
+        raise LookupError(coding)
+    out: List[bytes] = []
+    size, pos, view, d = 0, 0, memoryview(raw), new()
+    try:
+        while pos < len(raw):
+            piece = view[pos:pos + _PIECE]
+            pos += len(piece)
+            chunk = d.decompress(piece)
+            size += len(chunk)
+            if size > limit:
+                raise OverflowError(f"decompressed body exceeds {limit} bytes")
+            out.append(chunk)
+            if d.eof:  # concatenated members/frames: go on from where this one ended
+                pos -= len(d.unused_data)
+                if pos < len(raw):
+                    d = new()
+    except (zlib.error, zstandard.ZstdError) as e:
+        raise ValueError(str(e)) from e
+    if not d.eof:
+        raise ValueError("truncated body")
+    return b"".join(out)
+
+def compress(body: bytes, coding: str) -> bytes:
+    if coding == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body)
+    return zlib.compress(body, GZIP_LEVEL, wbits=31)
+
+def response_coding(accept_encoding: Optional[str]) -> Optional[str]:
+    """"zstd" or "gzip", whichever Accept-Encoding ranks higher (zstd at a tie); None for neither."""
+    q = {}
+    for entry in (accept_encoding or "").split(","):
+        name, *params = entry.split(";")
+        q[name.strip().lower()] = q_value(params)
+    weight = lambda c: q.get(c, q.get("*", 0.0))
+    coding = max(("zstd", "gzip"), key=lambda c: (weight(c), c == "zstd"))
+    return coding if weight(coding) > 0 else None
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        codings = [c.strip().lower() for c in headers.get("content-encoding", "").split(",")]
+        codings = [c for c in codings if c and c != "identity"]
+        if codings:
+            try:
+                body = await read_all(receive, BODY_MAX_BYTES)
+                for coding in reversed(codings):
+                    body = decompress(body, coding, BODY_MAX_BYTES)
+            except LookupError:
+                error = (415, f"unsupported Content-Encoding: {headers['content-encoding']}")
+            except OverflowError:
+                error = (413, f"request body exceeds {BODY_MAX_BYTES} bytes")
+            except ValueError as e:
+                error = (400, f"malformed {headers['content-encoding']} body: {e}")
+            else:
+                error = None
+            if error is not None:
+                await ORJSONResponse({"detail": error[1]}, status_code=error[0])(scope, receive, send)
+                return
+            kept = [(k, v) for k, v in scope["headers"] if k not in (b"content-encoding", b"content-length")]
+            scope = dict(scope, headers=kept + [(b"content-length", str(len(body)).encode())])
+            receive = replay(body, receive)
+        coding = response_coding(headers.get("accept-encoding"))
+        await self.app(scope, receive, send if coding is None else compressing(send, coding))
+
+async def read_all(receive: Receive, limit: int) -> bytes:
+    """The whole request body as sent; OverflowError past `limit` bytes."""
+    parts, size, more = [], 0, True
+    while more:
+        message = await receive()
+        if message["type"] != "http.request":  # client went away
+            break
+        parts.append(message.get("body", b""))
+        size += len(parts[-1])
+        if size > limit:
+            raise OverflowError
+        more = message.get("more_body", False)
+    return b"".join(parts)
+
+def replay(body: bytes, receive: Receive) -> Receive:
+    """`receive` that yields `body` in one message, then defers to the server's (disconnects)."""
+    sent = False
+
+    async def wrapped() -> Message:
+        nonlocal sent
+        if sent:
+            return await receive()
+        sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    return wrapped
+
+def compressing(send: Send, coding: str) -> Callable:
+    """
+    `send` that compresses a whole (single-message) compressible response body. Other responses are
+    decided at start and forwarded as they come (files may go out as `http.response.pathsend`).
+    """
+    start: Optional[Message] = None
+
+    async def wrapped(message: Message) -> None:
+        nonlocal start
+        if message["type"] == "http.response.start":
+            headers = MutableHeaders(raw=message["headers"])
+            if parse_media_type(headers.get("content-type")) in COMPRESSIBLE and "content-encoding" not in headers:
+                headers.add_vary_header("Accept-Encoding")
+                start = message  # held until the body shows whether to compress
+                return
+            await send(message)
+            return
+        if start is not None:
+            head, start = start, None
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                body = message.get("body", b"")
+                if len(body) >= COMPRESS_MIN_BYTES:
+                    body = compress(body, coding)
+                    headers = MutableHeaders(raw=head["headers"])
+                    headers["Content-Encoding"] = coding
+                    headers["Content-Length"] = str(len(body))
+                    message = dict(message, body=body)
+            await send(head)
+        await send(message)
+
+    return wrapped
@@ -0,0 +1,449 @@
+
+"""
+Schedule facts for the report prompt (energy per load, power per timestamp, peaks, windows,
+power levels), computed with NumPy on a columnar time x load view of the schedule.
+
+Sums are accumulated in the same order as a slot-by-slot loop would (np.cumsum is sequential,
+np.sum is pairwise), so the numbers, and the text formatted from them, don't depend on the engine.
+"""
+import hashlib, json, os, threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .caching import CacheCounters
+
+FACTS_CACHE_MAX_ENTRIES = int(os.getenv("FACTS_CACHE_MAX_ENTRIES", "256"))
+
+def wall_clock(times: Sequence[datetime]) -> np.ndarray:
+    """Wall-clock times to the second (what strftime("%Y-%m-%d %H:%M:%S") shows), as datetime64[s]."""
+    return np.array([t.replace(tzinfo=None) for t in times], dtype="datetime64[us]").astype("datetime64[s]")
+
+class ScheduleMatrix:
+    """
+    Columnar view of a schedule: one row per slot (schedule order), one column per load (order of
+    first appearance), and the flat (row, col, value) list of its items in slot/item order.
+    """
+
+    def __init__(
+        self, times: List[datetime], loads: List[str], row: np.ndarray, col: np.ndarray, value: np.ndarray,
+        wall: Optional[np.ndarray] = None, step_s: Optional[float] = None,
+    ):
+        self.times = times      # slot timestamps, as given (tz-aware or naive)
+        self.loads = loads
+        self.row = row
+        self.col = col
+        self.value = value      # kW
+        # wall-clock time of each slot, to the second (what strftime("%Y-%m-%d %H:%M:%S") shows)
+        self.wall = wall_clock(times) if wall is None else wall
+        self.step_s = step_s    # slot length, when the input states it
+
+    @classmethod
+    def from_slots(cls, slots: Sequence) -> "ScheduleMatrix":
+        """From parsed slots (`.timestamp`, `.data` of `.name`/`.value` items), streamed straight into arrays."""
+        counts = np.fromiter((len(slot.data) for slot in slots), dtype=np.int64, count=len(slots))
+        n = int(counts.sum())
+        index: Dict[str, int] = {}
+        col = np.fromiter((index.setdefault(it.name, len(index)) for slot in slots for it in slot.data), dtype=np.int64, count=n)
+        value = np.fromiter((it.value for slot in slots for it in slot.data), dtype=float, count=n)
+        row = np.repeat(np.arange(len(slots)), counts)
+        return cls([slot.timestamp for slot in slots], list(index), row, col, value)
+
+    @classmethod
+    def from_columns(cls, start: datetime, step_s: float, loads: List[str], values: Sequence, by_load: bool = False) -> "ScheduleMatrix":
+        """
+        From a dense kW grid: slots x loads (or loads x slots with `by_load`), None/NaN where a load
+        isn't listed; slot i starts at start + i * step_s. Items are listed in `loads` order within a slot.
+        """
+        grid = np.array(values, dtype=float)  # None -> NaN
+        if by_load:
+            grid = grid.T
+        if grid.ndim != 2:  # no slots, or no loads
+            grid = grid.reshape(-1 if loads else 0, len(loads))
+        row, col = np.nonzero(~np.isnan(grid))
+        times = [start + timedelta(seconds=step_s * i) for i in range(len(grid))]
+        return cls(times, list(loads), row, col, grid[row, col], step_s=step_s)
+
+    def fingerprint(self) -> str:
+        """sha256 of everything the matrix holds (timestamps with their offsets, loads, items in order)."""
+        h = hashlib.sha256(json.dumps([[t.isoformat() for t in self.times], self.loads, self.step_s]).encode("utf-8"))
+        for array in (self.row.astype(np.int64), self.col.astype(np.int64), self.value):
+            h.update(array.tobytes())
+        return h.hexdigest()
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return len(self.times), len(self.loads)
+
+    def slot_seconds(self) -> float:
+        """Slot duration: as stated, else from the first two timestamps. Default 900 s (15 min)."""
+        if self.step_s is not None:
+            return max(self.step_s, 3.6e-6)
+        if len(self.times) >= 2:
+            seconds = (self.times[1] - self.times[0]).total_seconds()
+            if seconds > 0:
+                return max(seconds, 3.6e-6)
+        return 900.0
+
+    def slot_hours(self) -> float:
+        return self.slot_seconds() / 3600.0
+
+    def day_blocks(self) -> List[Tuple[date, int, int]]:
+        """(day, first row, end row) of each run of consecutive slots on the same wall-clock day."""
+        days = self.wall.astype("datetime64[D]")
+        bounds = np.flatnonzero(np.r_[True, days[1:] != days[:-1], True]) if len(days) else np.zeros(1, dtype=np.int64)
+        return [(days[a].item(), a, b) for a, b in zip(bounds[:-1].tolist(), bounds[1:].tolist())]
+
+    def rows(self, start: int, end: int) -> "ScheduleMatrix":
+        """Slots start..end-1 and their items, same load columns."""
+        i, j = np.searchsorted(self.row, [start, end])
+        return ScheduleMatrix(
+            self.times[start:end], self.loads, self.row[i:j] - start, self.col[i:j], self.value[i:j],
+            wall=self.wall[start:end], step_s=self.step_s,
+        )
+
+    def energy_rows(self, slot_h: float) -> np.ndarray:
+        """
+        kWh of each item at its (slot, load) cell; a load listed twice in one slot goes to an extra
+        row, so summing each column down the rows adds its items in order.
+        """
+        n_rows, n_loads = self.shape
+        if not len(self.value):
+            return np.zeros((0, n_loads))
+        occurrence, depth = np.zeros(len(self.value), dtype=np.int64), 1
+        present = np.zeros((n_rows, n_loads), dtype=bool)
+        present[self.row, self.col] = True
+        if np.count_nonzero(present) < len(self.value):
+            key = self.row * n_loads + self.col
+            order = np.argsort(key, kind="stable")
+            sorted_key = key[order]
+            run_start = np.flatnonzero(np.r_[True, sorted_key[1:] != sorted_key[:-1]])
+            occurrence[order] = np.arange(len(key)) - np.repeat(run_start, np.diff(np.r_[run_start, len(key)]))
+            depth = int(occurrence.max()) + 1
+        kwh = np.zeros((n_rows * depth, n_loads))
+        kwh[self.row * depth + occurrence, self.col] = self.value * slot_h
+        return kwh
+
+    def slot_totals(self) -> np.ndarray:
+        """Total kW per slot, items added in the order they are listed."""
+        n_rows = len(self.times)
+        counts = np.bincount(self.row, minlength=n_rows)
+        width = int(counts.max()) if n_rows else 0
+        if not width:
+            return np.zeros(n_rows)
+        position = np.arange(len(self.row)) - np.repeat(np.cumsum(counts) - counts, counts)
+        by_position = np.zeros((n_rows, width))
+        by_position[self.row, position] = self.value
+        return np.cumsum(by_position, axis=1)[:, -1]
+
+    def load_windows(self, slot_h: float) -> Dict[str, List[Tuple[datetime, datetime]]]:
+        """
+        Contiguous (start_dt, end_dt) runs of slots listing each load; end_dt is exclusive
+        (the next slot's timestamp, or the last one + slot_h). Works on the item list, not a
+        time x load grid, so it stays linear in the items however long the schedule.
+        """
+        n_rows = len(self.times)
+        if not len(self.value):
+            return {}
+        pairs = np.sort(self.col * n_rows + self.row)  # (load, slot) pairs, by load then slot
+        pairs = pairs[np.r_[True, pairs[1:] != pairs[:-1]]]  # np.unique, minus its overhead
+        col, row = pairs // n_rows, pairs % n_rows
+        first = np.flatnonzero(np.r_[True, (col[1:] != col[:-1]) | (row[1:] != row[:-1] + 1)])
+        last = np.r_[first[1:], len(pairs)] - 1
+        last_end = self.times[-1] + timedelta(hours=slot_h)
+        windows: Dict[str, List[Tuple[datetime, datetime]]] = {}
+        for c, a, b in zip(col[first].tolist(), row[first].tolist(), (row[last] + 1).tolist()):
+            windows.setdefault(self.loads[c], []).append((self.times[a], self.times[b] if b < n_rows else last_end))
+        return windows
+
+    def power_levels(self) -> Dict[str, List[float]]:
+        """Distinct kW values of each load, ascending."""
+        return levels_by_load(self.loads, self.col, self.value)
+
+def levels_by_load(loads: List[str], col: np.ndarray, value: np.ndarray) -> Dict[str, List[float]]:
+    """Distinct values per load column, ascending."""
+    if not len(value):
+        return {}
+    levels, level_id = np.unique(value, return_inverse=True)
+    pairs = np.unique(col * len(levels) + level_id)  # (load, level) pairs, by load then kW
+    col, value = pairs // len(levels), levels[pairs % len(levels)]
+    bounds = np.flatnonzero(np.r_[True, col[1:] != col[:-1], True])
+    return {
+        loads[col[a]]: value[a:b].tolist()
+        for a, b in zip(bounds[:-1].tolist(), bounds[1:].tolist())
+    }
+
+class ScheduleWindows:
+    """
+    Run-length view of a schedule: one (load, start, end, kW) segment per run, in start order.
+    Everything derived from it works per segment, so cost follows the number of runs, not of slots.
+    """
+
+    def __init__(self, loads: List[str], col: np.ndarray, start: List[datetime], end: List[datetime], value: np.ndarray):
+        self.loads = loads
+        self.col = col
+        self.start = start
+        self.end = end
+        self.value = value      # kW
+        self.wall = wall_clock(start)
+        self.seconds = np.array([(b - a).total_seconds() for a, b in zip(start, end)], dtype=float)
+
+    @classmethod
+    def from_segments(cls, segments: Sequence) -> "ScheduleWindows":
+        """From parsed segments (`.name`, `.start`, `.end`, `.value`), already in start order."""
+        index: Dict[str, int] = {}
+        col = np.fromiter((index.setdefault(s.name, len(index)) for s in segments), dtype=np.int64, count=len(segments))
+        value = np.fromiter((s.value for s in segments), dtype=float, count=len(segments))
+        return cls(list(index), col, [s.start for s in segments], [s.end for s in segments], value)
+
+    def energy_by_load(self) -> np.ndarray:
+        """kWh per load (column order), segments added in start order."""
+        return np.bincount(self.col, weights=self.value * (self.seconds / 3600.0), minlength=len(self.loads))
+
+    def load_windows(self) -> Dict[str, List[Tuple[datetime, datetime]]]:
+        """Each load's segments, back-to-back ones merged (as consecutive slots are)."""
+        windows: Dict[str, List[Tuple[datetime, datetime]]] = {}
+        for k in np.argsort(self.col, kind="stable").tolist():
+            runs = windows.setdefault(self.loads[self.col[k]], [])
+            if runs and runs[-1][1] == self.start[k]:
+                runs[-1] = (runs[-1][0], self.end[k])
+            else:
+                runs.append((self.start[k], self.end[k]))
+        return windows
+
+    def power_levels(self) -> Dict[str, List[float]]:
+        """Distinct kW values of each load, ascending."""
+        return levels_by_load(self.loads, self.col, self.value)
+
+def power_by_timestamp(wall: np.ndarray, totals: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (wall-clock second, total kW) per distinct timestamp, in order of first appearance; a repeated
+    timestamp (e.g. a DST fall-back hour) keeps the total of its last slot. The peaks and the hourly
+    profile both read this series (energy per load still counts every slot).
+    """
+    keys = wall.astype(np.int64)
+    if len(keys) < 2 or np.all(keys[1:] > keys[:-1]):
+        return wall, totals
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    new = sorted_keys[1:] != sorted_keys[:-1]
+    first, last = order[np.r_[True, new]], order[np.r_[new, True]]
+    by_first = np.argsort(first)
+    return wall[first[by_first]], totals[last[by_first]]
+
+def peaks(totals: np.ndarray) -> Tuple[float, np.ndarray]:
+    """(peak kW, mask of the entries within 1e-9 of it)."""
+    if not len(totals):
+        return 0.0, np.zeros(0, dtype=bool)
+    peak = float(totals.max())
+    return peak, np.abs(totals - peak) < 1e-9
+
+_DAY_S = 86400
+
+def energy_bins(start: np.ndarray, seconds: np.ndarray, kw: np.ndarray, bin_s: int = 3600) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Resample constant-power intervals [start, start + seconds) (wall-clock datetime64, kW) into Wh
+    per `bin_s` bin of each calendar day they touch. `bin_s` must divide a day (900, 3600, 86400, ...).
+    An interval straddling bin edges is split at them; intervals may be any length, overlap or leave gaps.
+    Returns (days as datetime64[D], Wh array of shape days x bins per day).
+    """
+    if _DAY_S % bin_s:
+        raise ValueError(f"bin of {bin_s} s doesn't divide a day")
+    if not len(start):
+        return np.zeros(0, dtype="datetime64[D]"), np.zeros((0, _DAY_S // bin_s))
+    origin = start.min().astype("datetime64[D]")
+    begin = (start - origin) / np.timedelta64(1, "s")
+    end = begin + seconds
+    which, b, piece_s = split_at_bins(begin, end, bin_s)
+    n_days = max(int(np.ceil(end.max() / _DAY_S)), int(b.max() * bin_s // _DAY_S) + 1)
+    wh = np.bincount(b, weights=kw[which] * (piece_s / 3600.0) * 1000.0, minlength=n_days * _DAY_S // bin_s)
+    return origin + np.arange(n_days), wh.reshape(n_days, -1)
+
+def split_at_bins(begin: np.ndarray, end: np.ndarray, bin_s: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Cut intervals [begin, end) (seconds) at multiples of `bin_s`: (interval index, bin, seconds)
+    of each piece, in interval order. An empty interval gives one empty piece in its bin.
+    """
+    first = (begin // bin_s).astype(np.int64)
+    last = np.maximum(np.ceil(end / bin_s).astype(np.int64) - 1, first)
+    count = last - first + 1
+    which = np.repeat(np.arange(len(begin)), count)
+    b = first[which] + (np.arange(len(which)) - np.repeat(np.cumsum(count) - count, count))
+    piece_s = np.minimum(end[which], (b + 1) * bin_s) - np.maximum(begin[which], b * bin_s)
+    return which, b, piece_s
+
+def column_sums(rows: np.ndarray, carry: Optional[np.ndarray] = None) -> np.ndarray:
+    """Sum of each column, top to bottom (added on to `carry`, if given)."""
+    if carry is not None:
+        rows = np.vstack([carry, rows])
+    return np.cumsum(rows, axis=0)[-1] if len(rows) else np.zeros(rows.shape[1])
+
+def sequential_sum(values: np.ndarray) -> float:
+    """values[0] + values[1] + ... left to right, like the builtin sum()."""
+    return float(np.cumsum(values)[-1]) if len(values) else 0.0
+
+# =============== Facts (one pass, shared) ===============
+@dataclass(frozen=True)
+class LoadFacts:
+    name: str
+    energy_kwh: float
+    power_levels: Tuple[float, ...]                  # distinct kW values, ascending
+    windows: Tuple[Tuple[datetime, datetime], ...]   # contiguous runs, end exclusive
+
+@dataclass(frozen=True)
+class DayFacts:
+    """One calendar day of the schedule (the slots starting on it)."""
+    day: date
+    load_kwh: Tuple[float, ...]         # per load, in Facts.loads order
+    total_kwh: float                    # rounded to 3 decimals
+    peak_kw: float                      # rounded to 3 decimals
+    peak_times: Tuple[datetime, ...]
+
+@dataclass(frozen=True)
+class Facts:
+    """Everything the report states about one schedule. Immutable, so one instance serves every request for it."""
+    slot_hours: Optional[float]         # None for window-encoded schedules
+    loads: Tuple[LoadFacts, ...]        # order of first appearance
+    total_kwh: float                    # rounded to 3 decimals
+    peak_kw: float                      # rounded to 3 decimals
+    peak_times: Tuple[datetime, ...]    # wall-clock times at which the peak occurs
+    days: Tuple[date, ...]              # calendar days the schedule covers
+    hourly_wh: Tuple[Tuple[float, ...], ...]  # Wh per hour, 24 values per day
+    daily: Tuple[DayFacts, ...] = ()    # per day with slots, in schedule order
+
+    @property
+    def multi_day(self) -> bool:
+        return len(self.daily) > 1
+
+def compute_facts(m: ScheduleMatrix) -> Facts:
+    """
+    Derive all facts from the schedule's ScheduleMatrix (read once from its slots or columns). Energy and peaks are
+    computed a day of slots at a time, so the dense time x load arrays never exceed one day
+    (a 7-day, 1-minute schedule is ~10k slots); windows and levels work on the flat item list.
+    """
+    slot_h = m.slot_hours()
+    energy = np.zeros(len(m.loads))
+    daily: List[DayFacts] = []
+    slot_kw: List[np.ndarray] = []
+    for day, start, end in m.day_blocks():
+        block = m.rows(start, end)
+        kwh, day_totals = block.energy_rows(slot_h), block.slot_totals()
+        day_energy = column_sums(kwh)
+        energy = day_energy if not daily else column_sums(kwh, carry=energy)  # same order as one pass
+        day_wall, day_kw = power_by_timestamp(block.wall, day_totals)
+        day_peak, day_at_peak = peaks(day_kw)
+        daily.append(DayFacts(
+            day, tuple(day_energy.tolist()), round(sequential_sum(day_energy), 3),
+            round(day_peak, 3), tuple(day_wall[day_at_peak].tolist()),
+        ))
+        slot_kw.append(day_totals)
+    totals = np.concatenate(slot_kw) if slot_kw else np.zeros(0)
+    wall, kw = power_by_timestamp(m.wall, totals)
+    peak, at_peak = peaks(kw)
+    windows, levels = m.load_windows(slot_h), m.power_levels()
+    days, hourly = energy_bins(wall, np.full(len(wall), m.slot_seconds()), kw)  # same per-timestamp power as the peaks
+    return Facts(
+        slot_hours=slot_h,
+        loads=tuple(
+            LoadFacts(name, e, tuple(levels.get(name, ())), tuple(windows.get(name, ())))
+            for name, e in zip(m.loads, energy.tolist())
+        ),
+        total_kwh=round(sequential_sum(energy), 3),
+        peak_kw=round(peak, 3),
+        peak_times=tuple(wall[at_peak].tolist()),
+        days=tuple(days.tolist()),
+        hourly_wh=tuple(map(tuple, hourly.tolist())),
+        daily=tuple(daily),
+    )
+
+def compute_window_facts(w: ScheduleWindows) -> Facts:
+    """
+    Derive all facts straight from run segments: energy per segment (split at midnights for the
+    per-day figures) and total power over the intervals between consecutive segment edges.
+    Peak times are the starts of the peak intervals.
+    """
+    n_loads = len(w.loads)
+    energy = w.energy_by_load()
+    windows, levels = w.load_windows(), w.power_levels()
+    days, hourly = energy_bins(w.wall, w.seconds, w.value)
+    peak, peak_times, daily = 0.0, [], []
+    if len(w.value):
+        origin = w.wall.min().astype("datetime64[D]")
+        begin = (w.wall - origin) / np.timedelta64(1, "s")
+        end = begin + w.seconds
+        which, day, piece_s = split_at_bins(begin, end, _DAY_S)
+        n_days = int(day.max()) + 1
+        day_kwh = np.bincount(
+            day * n_loads + w.col[which], weights=w.value[which] * (piece_s / 3600.0), minlength=n_days * n_loads,
+        ).reshape(n_days, n_loads)
+        # total kW on each interval [edges[k], edges[k+1]): +kW where a segment starts, -kW where it ends
+        edges = np.unique(np.r_[begin, end, np.arange(1, n_days) * _DAY_S])
+        at_start, at_end = np.searchsorted(edges, begin), np.searchsorted(edges, end)
+        kw, running = np.zeros(len(edges)), np.zeros(len(edges), dtype=np.int64)
+        np.add.at(kw, at_start, w.value)
+        np.add.at(kw, at_end, -w.value)
+        np.add.at(running, at_start, 1)
+        np.add.at(running, at_end, -1)
+        kw = np.round(np.cumsum(kw)[:-1], 9)  # drops the +/- rounding drift
+        active = np.cumsum(running)[:-1] > 0
+        starts = origin + edges[:-1].astype(np.int64).astype("timedelta64[s]")
+        interval_day = (edges[:-1] // _DAY_S).astype(np.int64)
+
+        def peak_of(mask: np.ndarray) -> Tuple[float, List[datetime]]:
+            top = float(kw[mask].max())
+            at = mask & (np.abs(kw - top) < 1e-9)
+            return top, starts[at & ~np.r_[False, at[:-1]]].tolist()  # first interval of each peak run
+
+        peak, peak_times = peak_of(active)
+        for d in range(n_days):
+            in_day = active & (interval_day == d)
+            if in_day.any():
+                day_peak, day_times = peak_of(in_day)
+                daily.append(DayFacts(
+                    (origin + d).item(), tuple(day_kwh[d].tolist()), round(sequential_sum(day_kwh[d]), 3),
+                    round(day_peak, 3), tuple(day_times),
+                ))
+    return Facts(
+        slot_hours=None,
+        loads=tuple(
+            LoadFacts(name, e, tuple(levels.get(name, ())), tuple(windows.get(name, ())))
+            for name, e in zip(w.loads, energy.tolist())
+        ),
+        total_kwh=round(sequential_sum(energy), 3),
+        peak_kw=round(peak, 3),
+        peak_times=tuple(peak_times),
+        days=tuple(days.tolist()),
+        hourly_wh=tuple(map(tuple, hourly.tolist())),
+        daily=tuple(daily),
+    )
+
+class FactsCache(CacheCounters):
+    """Facts by payload digest; least-recently-used entries beyond `max_entries` are dropped (per worker)."""
+
+    def __init__(self, max_entries: int = FACTS_CACHE_MAX_ENTRIES):
+        super().__init__()
+        self.max_entries = max_entries
+        self._items: "OrderedDict[str, Facts]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, compute: Callable[[], Facts]) -> Facts:
+        with self._lock:
+            facts: Optional[Facts] = self._items.get(key)
+            if facts is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return facts
+            self.misses += 1
+        facts = compute()
+        with self._lock:
+            self._items[key] = facts
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+                self.evictions += 1
+        return facts
+
+    def stats(self) -> dict:
+        return super().stats(entries=len(self._items))
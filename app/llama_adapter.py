@@ -1,11 +1,38 @@
 
-import os, requests
+import os, json, httpx
+from typing import AsyncIterator, Optional, Tuple
+
+from .llm_cache import cache_key, get_cache
 
 LLAMA_BACKEND = os.getenv("LLAMA_BACKEND", "OLLAMA").upper()
 LLAMA_MODEL = os.getenv("LLAMA_MODEL", "llama3.2")
 LLAMA_ENDPOINT = os.getenv("LLAMA_ENDPOINT", "http://localhost:11434")
+LLAMA_TIMEOUT = float(os.getenv("LLAMA_TIMEOUT", "120"))
+# Keep-alive connections kept open to the backend
+LLAMA_POOL_SIZE = int(os.getenv("LLAMA_POOL_SIZE", "40"))
+# Upper bound on concurrent in-flight requests from the async client
+LLAMA_MAX_CONNECTIONS = int(os.getenv("LLAMA_MAX_CONNECTIONS", "1000"))
+
+# Created lazily inside the running event loop and shared by every request and backend branch
+_async_client: Optional[httpx.AsyncClient] = None
+
+def get_async_client() -> httpx.AsyncClient:
+    global _async_client
+    if _async_client is None or _async_client.is_closed:
+        _async_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(LLAMA_TIMEOUT),
+            limits=httpx.Limits(max_connections=LLAMA_MAX_CONNECTIONS, max_keepalive_connections=LLAMA_POOL_SIZE),
+        )
+    return _async_client
+
+async def aclose_async_client() -> None:
+    global _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
 
-def generate_text(system: str, prompt: str, max_tokens: int = 512, temperature: float = 0.2) -> str:
+def _build_request(system: str, prompt: str, max_tokens: int, temperature: float) -> Tuple[str, dict]:
+    """Backend-specific (url, json payload) for a non-streaming generation."""
     if LLAMA_BACKEND == "OLLAMA":
         url = f"{LLAMA_ENDPOINT}/api/chat"
         payload = {
@@ -17,8 +44,7 @@ def generate_text(system: str, prompt: str, max_tokens: int = 512, temperature:
             "stream": False,
             "options": {"temperature": temperature, "num_predict": max_tokens}
         }
-        r = requests.post(url, json=payload, timeout=120); r.raise_for_status()
-        return r.json().get("message", {}).get("content", "")
+        return url, payload
 
     elif LLAMA_BACKEND == "VLLM":
         url = f"{LLAMA_ENDPOINT}/v1/chat/completions"
@@ -31,15 +57,92 @@ def generate_text(system: str, prompt: str, max_tokens: int = 512, temperature:
             "max_tokens": max_tokens,
             "temperature": temperature
         }
-        r = requests.post(url, json=payload, timeout=120); r.raise_for_status()
-        return r.json()["choices"][0]["message"]["content"]
+        return url, payload
 
     elif LLAMA_BACKEND == "TGI":
         url = f"{LLAMA_ENDPOINT}/generate"
         full_prompt = f"<<SYS>>{system}<<SYS>>\n{prompt}"
         payload = {"inputs": full_prompt, "parameters": {"max_new_tokens": max_tokens, "temperature": temperature}}
-        r = requests.post(url, json=payload, timeout=120); r.raise_for_status()
-        return r.json()["generated_text"]
+        return url, payload
 
     else:
         raise RuntimeError(f"Unsupported LLAMA_BACKEND: {LLAMA_BACKEND}")
+
+def _parse_response(data: dict) -> str:
+    if LLAMA_BACKEND == "OLLAMA":
+        return data.get("message", {}).get("content", "")
+    elif LLAMA_BACKEND == "VLLM":
+        return data["choices"][0]["message"]["content"]
+    return data["generated_text"]
+
+def _key(system: str, prompt: str, max_tokens: int, temperature: float) -> str:
+    return cache_key(LLAMA_BACKEND, LLAMA_MODEL, temperature, max_tokens, system, prompt)
+
+async def generate_text_async(system: str, prompt: str, max_tokens: int = 512, temperature: float = 0.2) -> str:
+    """Non-streaming generation, served from the LLM cache when the same request was answered before."""
+    cache, key = get_cache(), _key(system, prompt, max_tokens, temperature)
+    if cache is not None and (hit := cache.get(key)) is not None:
+        return hit
+    url, payload = _build_request(system, prompt, max_tokens, temperature)
+    r = await get_async_client().post(url, json=payload); r.raise_for_status()
+    text = _parse_response(r.json())
+    if cache is not None and text:
+        cache.put(key, text)
+    return text
+
+def _build_stream_request(system: str, prompt: str, max_tokens: int, temperature: float) -> Tuple[str, dict]:
+    url, payload = _build_request(system, prompt, max_tokens, temperature)
+    if LLAMA_BACKEND == "TGI":
+        return f"{LLAMA_ENDPOINT}/generate_stream", payload
+    payload["stream"] = True  # Ollama: NDJSON chunks; vLLM: SSE chunks
+    return url, payload
+
+def _parse_stream_line(line: str) -> Tuple[Optional[str], bool]:
+    """
+    (text delta or None, whether the generation is complete) of one streamed line: Ollama `done`,
+    vLLM `[DONE]`, TGI's final event or end-of-sequence token. Raises on an error line.
+    """
+    line = line.strip()
+    if not line:
+        return None, False
+    if LLAMA_BACKEND == "OLLAMA":
+        chunk = json.loads(line)
+    else:
+        # vLLM and TGI both stream Server-Sent Events
+        if not line.startswith("data:"):
+            return None, False
+        data = line[len("data:"):].strip()
+        if data == "[DONE]":
+            return None, True
+        chunk = json.loads(data)
+    if chunk.get("error"):
+        raise RuntimeError(f"{LLAMA_BACKEND} stream error: {chunk['error']}")
+    if LLAMA_BACKEND == "OLLAMA":
+        return chunk.get("message", {}).get("content") or None, bool(chunk.get("done"))
+    if LLAMA_BACKEND == "VLLM":
+        choices = chunk.get("choices") or [{}]
+        return choices[0].get("delta", {}).get("content") or None, False
+    token = chunk.get("token") or {}
+    done = bool(token.get("special")) or chunk.get("generated_text") is not None
+    return None if token.get("special") else (token.get("text") or None), done
+
+async def stream_text_async(system: str, prompt: str, max_tokens: int = 512, temperature: float = 0.2) -> AsyncIterator[str]:
+    """Yield text deltas as the backend produces them (a cache hit is yielded in one piece)."""
+    cache, key = get_cache(), _key(system, prompt, max_tokens, temperature)
+    if cache is not None and (hit := cache.get(key)) is not None:
+        yield hit
+        return
+    parts, done = [], False
+    url, payload = _build_stream_request(system, prompt, max_tokens, temperature)
+    async with get_async_client().stream("POST", url, json=payload) as r:
+        r.raise_for_status()
+        async for line in r.aiter_lines():
+            delta, finished = _parse_stream_line(line)
+            done = done or finished
+            if delta:
+                parts.append(delta)
+                yield delta
+    # only complete, non-empty generations are cached (a stream cut short leaves no terminal marker)
+    text = "".join(parts)
+    if cache is not None and done and text:
+        cache.put(key, text)
@@ -0,0 +1,23 @@
+
+import os, json, hashlib
+
+from .caching import SqliteLRU, process_wide
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "1").lower() not in ("0", "false", "no")
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", ".cache/llm_cache.sqlite3")
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
+LLM_CACHE_TTL_S = float(os.getenv("LLM_CACHE_TTL_S", str(7 * 24 * 3600)))
+
+def cache_key(backend: str, model: str, temperature: float, max_tokens: int, system: str, prompt: str) -> str:
+    """Content address of one generation request."""
+    raw = json.dumps([backend, model, float(temperature), int(max_tokens), system, prompt], ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+class LLMCache(SqliteLRU):
+    """Generated texts by cache_key, in the `llm_cache` table of an SQLite file shared by the workers."""
+
+    def __init__(self, path: str, max_entries: int = LLM_CACHE_MAX_ENTRIES, ttl_s: float = LLM_CACHE_TTL_S):
+        super().__init__(path, "llm_cache", max_entries, ttl_s)
+
+# process-wide cache, opened on first use; None when LLM_CACHE_ENABLED is off
+get_cache = process_wide(LLM_CACHE_ENABLED, lambda: LLMCache(LLM_CACHE_PATH))
@@ -1,26 +1,67 @@
 # app/main.py
-from fastapi import FastAPI, Body, Response
-from fastapi.responses import FileResponse, JSONResponse
-from starlette.background import BackgroundTask
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import FileResponse, ORJSONResponse, StreamingResponse
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 
-import os
-import json
 import random
-import tempfile
+import os
+import hashlib
+import asyncio
 import re
-from typing import Optional, Dict, List, Set
-from datetime import datetime, timedelta
-
-from pydantic import BaseModel, Field, validator
+from typing import Any, AsyncIterator, Awaitable, Callable, Literal, Optional, Dict, List, Tuple, Type, TypeVar, Union
+from datetime import date, datetime
 
-# ---------------- OpenAI TTS ----------------
-from openai import OpenAI
+import orjson
+from pydantic import BaseModel, Field, PrivateAttr, ValidationError, validator, model_validator
 
 # ----------------- Load .env ----------------
 load_dotenv()
 
-app = FastAPI(title="HEMS Persona Reporter", version="3.1.0")
+# =============== LLM adapter (project function) ===============
+from .llama_adapter import generate_text_async, stream_text_async, aclose_async_client
+from .llm_cache import get_cache
+from .singleflight import SingleFlight
+from .report_store import get_report_store
+from .tts_adapter import (
+    TTSBackend, select_backend, fallback_for, aclose_backends, TTS_CHUNK_CHARS, TTS_MAX_WORKERS,
+    AUDIO_FORMATS, SPLICEABLE_FORMATS, PCM_RATE, media_type, wav_header, patch_wav_sizes,
+)
+from .mp3 import audio_frames
+from .audio_cache import audio_cache_key, get_audio_cache
+from .facts import Facts, FactsCache, ScheduleMatrix, ScheduleWindows, compute_facts, compute_window_facts
+from .schedule_decode import is_sorted, slots_matrix
+from .compression import CompressionMiddleware
+from .media_types import (
+    BODY_MEDIA_TYPES, RESPONSE_MEDIA_TYPES, JSON, MSGPACK, CBOR, parse_media_type, load_binary, negotiate,
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    prewarm = asyncio.ensure_future(prewarm_phrase_audio(TTS_PREWARM_PERSONAS)) if TTS_PREWARM_PERSONAS else None
+    yield
+    if prewarm is not None:
+        prewarm.cancel()
+    await aclose_async_client()
+    await aclose_backends()
+
+# orjson for every JSON body: same UTF-8 text as json.dumps(ensure_ascii=False), compact, several times faster
+app = FastAPI(title="HEMS Persona Reporter", version="3.1.0", lifespan=lifespan, default_response_class=ORJSONResponse)
+# gzip/zstd request bodies decompressed, whole JSON/MessagePack/CBOR responses compressed (app/compression.py)
+app.add_middleware(CompressionMiddleware)
+
+@app.exception_handler(RequestValidationError)
+async def validation_error(request: Request, exc: RequestValidationError) -> ORJSONResponse:
+    """FastAPI's 422 body, through the app's JSON encoder."""
+    return ORJSONResponse({"detail": jsonable_encoder(exc.errors())}, status_code=422)
+
+# Personas whose openers are synthesized at startup ("all" = built-in CHARACTERS); others on first use
+TTS_PREWARM_PERSONAS = [p.strip() for p in os.getenv("TTS_PREWARM_PERSONAS", "").split(",") if p.strip()]
+# bodies from this size on are decoded in the threadpool, so the event loop keeps serving other requests
+DECODE_THREAD_MIN_BYTES = int(os.getenv("DECODE_THREAD_MIN_BYTES", str(256 * 1024)))
 
 # ================== Domain Models (inline) ==================
 class DataItem(BaseModel):
@@ -38,14 +79,246 @@ class CostAnalysis(BaseModel):
     total_solar_revenue: Optional[float] = None
     currency: str = "EUR"
 
+class ScheduleColumns(BaseModel):
+    """
+    Compact schedule: slot i starts at `start + i * step_minutes`; `values[i][j]` is the kW of `loads[j]`
+    in slot i, null when the load isn't listed in it. `series` ({load: kW per slot}) may replace loads/values.
+    """
+    start: datetime
+    step_minutes: float = Field(default=15.0, gt=0)
+    loads: List[str] = Field(default_factory=list)
+    values: List[List[Optional[float]]] = Field(default_factory=list)
+    series: Optional[Dict[str, List[Optional[float]]]] = None
+
+    @model_validator(mode="after")
+    def _rectangular(self) -> "ScheduleColumns":
+        if self.series is not None:
+            if self.loads or self.values:
+                raise ValueError("give either 'series' or 'loads'/'values'")
+            if len({len(v) for v in self.series.values()}) > 1:
+                raise ValueError("every 'series' needs one value per slot")
+            return self
+        if len(set(self.loads)) != len(self.loads):
+            raise ValueError("'loads' must be unique")
+        for i, row in enumerate(self.values):
+            if len(row) != len(self.loads):
+                raise ValueError(f"values[{i}] has {len(row)} entries for {len(self.loads)} loads")
+        return self
+
+    def matrix(self) -> ScheduleMatrix:
+        if self.series is not None:
+            return ScheduleMatrix.from_columns(
+                self.start, self.step_minutes * 60, list(self.series), list(self.series.values()), by_load=True,
+            )
+        return ScheduleMatrix.from_columns(self.start, self.step_minutes * 60, self.loads, self.values)
+
+MIXED_TZ = "mix of naive and timezone-aware times"
+
+class LoadWindow(BaseModel):
+    """One run of a load: `value` kW from `start` (inclusive) to `end` (exclusive)."""
+    name: str
+    start: datetime
+    end: datetime
+    value: float
+
+    @model_validator(mode="after")
+    def _not_empty(self) -> "LoadWindow":
+        if (self.start.tzinfo is None) != (self.end.tzinfo is None):
+            raise ValueError(MIXED_TZ)
+        if self.end <= self.start:
+            raise ValueError("'end' must be after 'start'")
+        return self
+
 class OptimizationSchedule(BaseModel):
+    """
+    A schedule as `schedule` (one object per slot), `columns` (compact, see ScheduleColumns)
+    or `windows` (one object per run of a load).
+    """
     schedule: List[ScheduleSlot] = Field(default_factory=list)
+    columns: Optional[ScheduleColumns] = None
+    windows: Optional[List[LoadWindow]] = None
     cost_analysis: Optional[CostAnalysis] = None
+    _digest: Optional[str] = PrivateAttr(default=None)
+    _matrix: Optional[ScheduleMatrix] = PrivateAttr(default=None)  # slot shape, once read (or decoded directly)
 
     @validator("schedule")
     def _ensure_sorted(cls, v: List[ScheduleSlot]) -> List[ScheduleSlot]:
+        if len({s.timestamp.tzinfo is None for s in v}) > 1:
+            raise ValueError(MIXED_TZ)
+        if is_sorted([s.timestamp for s in v]):
+            return v
         return sorted(v, key=lambda s: s.timestamp)
 
+    @validator("windows")
+    def _no_overlap(cls, v: Optional[List[LoadWindow]]) -> Optional[List[LoadWindow]]:
+        if v is None:
+            return v
+        if len({w.start.tzinfo is None for w in v}) > 1:
+            raise ValueError(MIXED_TZ)
+        v = sorted(v, key=lambda w: w.start)
+        busy_until: Dict[str, datetime] = {}
+        for w in v:
+            if w.name in busy_until and w.start < busy_until[w.name]:
+                raise ValueError(f"windows of '{w.name}' overlap at {w.start.isoformat()}")
+            busy_until[w.name] = max(w.end, busy_until.get(w.name, w.end))
+        return v
+
+    @model_validator(mode="after")
+    def _one_shape(self) -> "OptimizationSchedule":
+        if sum((bool(self.schedule), self.columns is not None, self.windows is not None)) > 1:
+            raise ValueError("give only one of 'schedule', 'columns' or 'windows'")
+        return self
+
+    @classmethod
+    def from_matrix(cls, matrix: ScheduleMatrix, cost_analysis: Optional[CostAnalysis] = None) -> "OptimizationSchedule":
+        """Slot-shaped schedule already read into a ScheduleMatrix (see decode_schedule); `schedule` stays empty."""
+        payload = cls.model_construct(cost_analysis=cost_analysis)
+        payload._matrix = matrix
+        return payload
+
+    def matrix(self) -> ScheduleMatrix:
+        """Columnar view for the facts engine, read straight from the slot-based shape that was sent."""
+        if self.columns is not None:
+            return self.columns.matrix()
+        if self._matrix is None:
+            self._matrix = ScheduleMatrix.from_slots(self.schedule)
+        return self._matrix
+
+    def facts(self) -> Facts:
+        """Report facts of the schedule, from whichever shape was sent (windows are never expanded into slots)."""
+        if self.windows is not None:
+            return compute_window_facts(ScheduleWindows.from_segments(self.windows))
+        return compute_facts(self.matrix())
+
+    def digest(self) -> str:
+        """
+        sha256 of the normalized payload, computed once per instance: slots by their ScheduleMatrix
+        (the same whichever decoder read them), the rest re-serialized.
+        """
+        if self._digest is None:
+            h = hashlib.sha256(self.model_dump_json(exclude={"schedule"}).encode("utf-8"))
+            if self.columns is None and self.windows is None:
+                h.update(self.matrix().fingerprint().encode("ascii"))
+            self._digest = h.hexdigest()
+        return self._digest
+
+class ReportAudioRequest(BaseModel):
+    """Speak an existing report: its exact text, or the report_id returned by /persona_report."""
+    text: Optional[str] = Field(default=None, max_length=4096)  # OpenAI TTS input limit
+    report_id: Optional[str] = None
+    persona: Optional[str] = None
+
+    @model_validator(mode="after")
+    def _text_or_id(self) -> "ReportAudioRequest":
+        if not (self.text or self.report_id):
+            raise ValueError("either 'text' or 'report_id' is required")
+        return self
+
+AudioFormat = Literal[AUDIO_FORMATS]
+T = TypeVar("T")
+
+# ================== Request decoding ==================
+def read_body(raw: bytes, media: str = JSON) -> Any:
+    """Decoded document of a body; None for JSON that doesn't parse (pydantic then reports it)."""
+    if media == JSON:
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            return None
+    try:
+        return load_binary(raw, media)
+    except ValueError as e:
+        fmt, name = ("msgpack", "MessagePack") if media == MSGPACK else ("cbor", "CBOR")
+        msg = f"Invalid {name}: {e}" if str(e) else f"Invalid {name}"
+        raise RequestValidationError([{"type": f"{fmt}_invalid", "loc": ("body",), "msg": msg, "input": None}])
+
+def decode_schedule(raw: bytes, media: str = JSON, doc: Any = None) -> OptimizationSchedule:
+    """
+    OptimizationSchedule from a request body (`doc`: the body already decoded, if at hand). The
+    per-slot shape is read by app/schedule_decode.py straight into a ScheduleMatrix; other shapes,
+    and anything that fast path declines, by pydantic.
+    """
+    if doc is None:
+        doc = read_body(raw, media)
+    if type(doc) is dict and "columns" not in doc and "windows" not in doc:
+        matrix = slots_matrix(doc.get("schedule", []))
+        cost = doc.get("cost_analysis")
+        if matrix is not None:
+            try:
+                return OptimizationSchedule.from_matrix(matrix, None if cost is None else CostAnalysis.model_validate(cost))
+            except ValidationError:
+                pass
+    if media == JSON:
+        return OptimizationSchedule.model_validate_json(raw)
+    return OptimizationSchedule.model_validate(doc)
+
+def body_error(e: ValidationError) -> RequestValidationError:
+    """The 422 FastAPI gives for an invalid body model."""
+    return RequestValidationError([{**err, "loc": ("body", *err["loc"])} for err in e.errors(include_url=False)])
+
+async def request_body(request: Request) -> Tuple[bytes, str]:
+    """Raw body and how to read it: MessagePack/CBOR by Content-Type, anything else as JSON."""
+    raw = await request.body()
+    if not raw:
+        raise RequestValidationError([{"type": "missing", "loc": ("body",), "msg": "Field required", "input": None}])
+    media = parse_media_type(request.headers.get("content-type"))
+    if media == CBOR and media not in BODY_MEDIA_TYPES:
+        raise HTTPException(415, "CBOR bodies need the cbor2 package on the server")
+    return raw, media if media in BODY_MEDIA_TYPES else JSON
+
+async def off_loop(decode: Callable[[bytes, str], T], raw: bytes, media: str) -> T:
+    """`decode(raw, media)`, in the threadpool for bodies of DECODE_THREAD_MIN_BYTES or more."""
+    if len(raw) >= DECODE_THREAD_MIN_BYTES:
+        return await run_in_threadpool(decode, raw, media)
+    return decode(raw, media)
+
+async def schedule_body(request: Request) -> OptimizationSchedule:
+    raw, media = await request_body(request)
+    try:
+        return await off_loop(decode_schedule, raw, media)
+    except ValidationError as e:
+        raise body_error(e)
+
+def decode_audio_request(raw: bytes, media: str = JSON) -> Union[ReportAudioRequest, OptimizationSchedule]:
+    """A ReportAudioRequest when the body names `text` or `report_id`, else a schedule."""
+    doc = read_body(raw, media)
+    if type(doc) is dict and ("text" in doc or "report_id" in doc):
+        return ReportAudioRequest.model_validate(doc)
+    return decode_schedule(raw, media, doc)
+
+async def audio_body(request: Request) -> Union[ReportAudioRequest, OptimizationSchedule]:
+    raw, media = await request_body(request)
+    try:
+        return await off_loop(decode_audio_request, raw, media)
+    except ValidationError as e:
+        raise body_error(e)
+
+async def response_class(request: Request) -> Type[Response]:
+    """JSON, MessagePack or CBOR response, as the client's Accept header asks."""
+    return negotiate(request.headers.get("accept"))
+
+def body_openapi(*models: type) -> dict:
+    """`openapi_extra` documenting the body of a route that decodes it itself."""
+    refs = [{"$ref": f"#/components/schemas/{m.__name__}"} for m in models]
+    schema = refs[0] if len(refs) == 1 else {"anyOf": refs}
+    return {"requestBody": {"required": True, "content": {t: {"schema": schema} for t in BODY_MEDIA_TYPES}}}
+
+# `responses` of the routes whose body follows Accept
+NEGOTIATED = {200: {"content": {t: {} for t in RESPONSE_MEDIA_TYPES}}}
+VARY_ACCEPT = {"Vary": "Accept"}
+
+def openapi() -> dict:
+    """FastAPI's schema, plus the body models it doesn't see (they aren't route parameters)."""
+    if app.openapi_schema is None:
+        schemas = FastAPI.openapi(app).setdefault("components", {}).setdefault("schemas", {})
+        for model in (OptimizationSchedule, ReportAudioRequest):
+            schema = model.model_json_schema(ref_template="#/components/schemas/{model}")
+            schemas.update(schema.pop("$defs", {}))
+            schemas[model.__name__] = schema
+    return app.openapi_schema
+
+app.openapi = openapi
+
 # ================== Personas ==================
 CHARACTERS = [
     "Master Yoda", "James Bond", "Homer Simpson", "Sherlock Holmes",
@@ -65,116 +338,70 @@ def strip_markdown(md_text: str) -> str:
 def pick_persona(maybe_persona: Optional[str]) -> str:
     return maybe_persona.strip() if maybe_persona else random.choice(CHARACTERS)
 
-def _guess_slot_hours(payload: "OptimizationSchedule") -> float:
-    """Guess slot duration from the first two timestamps. Default 0.25h (15 min)."""
-    ts = [slot.timestamp for slot in payload.schedule]
-    if len(ts) >= 2:
-        delta = ts[1] - ts[0]
-        if isinstance(delta, timedelta) and delta.total_seconds() > 0:
-            return max(delta.total_seconds() / 3600.0, 1e-9)
-    return 0.25  # 15 min default
+def opening_line(who: str) -> str:
+    return f"Olá! Sou {who}, e estou aqui para indicar os horários ideais de consumo."
 
-def compute_from_schedule(payload: "OptimizationSchedule"):
-    """
-    Returns:
-      power_by_ts: dict[ts_str] -> total kW at that slot
-      energy_by_load: dict[load] -> total kWh over day
-      total_kwh: float
-      peak_kw: float
-      peak_ts: list[ts_str] where peak occurs
-    """
-    slot_h = _guess_slot_hours(payload)
-    power_by_ts: Dict[str, float] = {}
-    energy_by_load: Dict[str, float] = {}
-
-    for slot in payload.schedule:
-        ts_str = slot.timestamp.strftime("%Y-%m-%d %H:%M:%S")
-        p_sum = 0.0
-        for it in slot.data:
-            val_kw = float(it.value)
-            p_sum += val_kw
-            energy_by_load[it.name] = energy_by_load.get(it.name, 0.0) + val_kw * slot_h
-        power_by_ts[ts_str] = p_sum
-
-    total_kwh = round(sum(energy_by_load.values()), 3)
-    peak_kw_val = max(power_by_ts.values()) if power_by_ts else 0.0
-    peak_kw = round(peak_kw_val, 3)
-    peak_ts = [ts for ts, p in power_by_ts.items() if abs(p - peak_kw_val) < 1e-9]
-    return power_by_ts, energy_by_load, total_kwh, peak_kw, peak_ts
-
-def build_24h_csv(power_by_ts: Dict[str, float]) -> str:
-    """
-    Convert quarter-hour kW to hourly Wh sums.
-    """
-    per_hour_Wh: Dict[int, float] = {h: 0.0 for h in range(24)}
-    for ts, p_kw in power_by_ts.items():
-        hour = int(ts[11:13])
-        per_hour_Wh[hour] += float(p_kw) * 0.25 * 1000.0  # 0.25h * kW -> kWh -> Wh
-    lines = ["Hour,Power_W"]
-    for h in range(24):
-        lines.append(f"{h},{per_hour_Wh.get(h, 0.0):.1f}")
-    return "\n".join(lines)
+def costs_section(cost_lines: List[str]) -> str:
+    return "## Custos do dia\n" + "\n".join(f"- {x}" for x in cost_lines) + "\n"
 
-def load_windows_15m(payload: "OptimizationSchedule") -> Dict[str, List[tuple]]:
+def build_24h_csv(facts: Facts) -> str:
     """
-    Build contiguous (start_dt, end_dt) windows per load using slot step (e.g., 15 min).
-    end_dt is exclusive. Assumes schedule is sorted.
+    CSV of the hourly Wh sums (average W over each hour). One day of slots: `Hour,Power_W`, with energy that
+    runs past midnight folded onto the same hours; several (Facts.multi_day): `Date,Hour,Power_W`, 24 rows per day.
     """
-    windows: Dict[str, List[tuple]] = {}
-    active_start: Dict[str, datetime] = {}
-    slot_h = _guess_slot_hours(payload)
-
-    for i, slot in enumerate(payload.schedule):
-        ts = slot.timestamp
-        present: Set[str] = {it.name for it in slot.data}
-
-        # close windows for loads that stop being present
-        for name in list(active_start.keys()):
-            if name not in present:
-                windows.setdefault(name, []).append((active_start[name], ts))
-                del active_start[name]
+    if not facts.multi_day:
+        lines = ["Hour,Power_W"]
+        for h, wh in enumerate(map(sum, zip(*facts.hourly_wh)) if facts.hourly_wh else (0.0,) * 24):
+            lines.append(f"{h},{wh:.1f}")
+        return "\n".join(lines)
+    lines = ["Date,Hour,Power_W"]
+    for day, per_hour in zip(facts.days, facts.hourly_wh):
+        for h, wh in enumerate(per_hour):
+            lines.append(f"{day.isoformat()},{h},{wh:.1f}")
+    return "\n".join(lines)
 
-        # open windows for newly present loads
-        for it in slot.data:
-            if it.name not in active_start:
-                active_start[it.name] = ts
+WEEKDAYS_PT = ("seg", "ter", "qua", "qui", "sex", "sáb", "dom")
 
-        # last slot: close any active windows at +slot_h
-        if i == len(payload.schedule) - 1:
-            last_end = ts + timedelta(hours=slot_h)
-            for name, st in active_start.items():
-                windows.setdefault(name, []).append((st, last_end))
-            active_start.clear()
+def fmt_day_pt(d: date) -> str:
+    return f"{WEEKDAYS_PT[d.weekday()]} {d.strftime('%d/%m')}"
 
-    return windows
+def fmt_time_pt(t: datetime, dated: bool = False) -> str:
+    return f"{fmt_day_pt(t)} {t.strftime('%Hh%M')}" if dated else t.strftime("%Hh%M")
 
-def fmt_range_pt(start_dt: datetime, end_dt: datetime) -> str:
-    return f"{start_dt.strftime('%Hh%M')}–{end_dt.strftime('%Hh%M')}"
+def fmt_range_pt(start_dt: datetime, end_dt: datetime, dated: bool = False) -> str:
+    """HHhMM–HHhMM; `dated` prefixes the day, and repeats it on the end when the window ends on another day."""
+    if not dated:
+        return f"{start_dt.strftime('%Hh%M')}–{end_dt.strftime('%Hh%M')}"
+    return f"{fmt_time_pt(start_dt, True)}–{fmt_time_pt(end_dt, end_dt.date() != start_dt.date())}"
 
 # ================== Health ==================
 @app.get("/health")
 def health():
     return {"ok": True}
 
-# =============== LLM adapter (project function) ===============
-from .llama_adapter import generate_text
+@app.get("/stats")
+def stats():
+    cache, audio_cache = get_cache(), get_audio_cache()
+    return {
+        "llm_cache": cache.stats() if cache is not None else None,
+        "report_singleflight": _report_flights.stats(),
+        "audio_cache": audio_cache.stats() if audio_cache is not None else None,
+        "facts_cache": _facts.stats(),
+    }
 
 # =============== Persona report (TEXT) ===============
-@app.post("/persona_report")
-def persona_report(payload: OptimizationSchedule = Body(...), persona: Optional[str] = None):
-    # derive facts from optimized schedule (15m aware)
-    power_by_ts, energy_by_load, total_kwh, peak_kw, peak_kw_ts = compute_from_schedule(payload)
-    csv_24h = build_24h_csv(power_by_ts)
-    hhmm = ", ".join([f"{int(ts[11:13]):02d}h{ts[14:16]}" for ts in peak_kw_ts]) if peak_kw_ts else ""
-
-    # contiguous windows per load (15m)
-    win = load_windows_15m(payload)
-
-    # distinct power values per load (kW)
-    power_values_by_load: Dict[str, Set[float]] = {}
-    for slot in payload.schedule:
-        for it in slot.data:
-            power_values_by_load.setdefault(it.name, set()).add(float(it.value))
+# facts per payload digest, shared by the text, stream and audio paths
+_facts = FactsCache()
+
+def schedule_facts(payload: OptimizationSchedule) -> Facts:
+    return _facts.get(payload.digest(), payload.facts)
+
+def build_report_prompts(payload: OptimizationSchedule, who: str) -> Tuple[str, str, List[str]]:
+    """Derive facts from the optimized schedule and return (system, user, cost_lines) for the LLM."""
+    facts = schedule_facts(payload)
+    csv_24h = build_24h_csv(facts)
+    dated = facts.multi_day  # several calendar days: every time gets its day
+    hhmm = ", ".join(fmt_time_pt(t, dated) for t in facts.peak_times)
 
     # cost analysis (optional)
     ca = payload.cost_analysis
@@ -186,8 +413,8 @@ def persona_report(payload: OptimizationSchedule = Body(...), persona: Optional[
         total_load_cost = ca.total_load_cost
         total_solar_revenue = ca.total_solar_revenue
 
-    def fmt_windows(name: str) -> str:
-        ranges = [fmt_range_pt(a, b) for (a, b) in win.get(name, [])]
+    def fmt_windows(windows: Tuple[Tuple[datetime, datetime], ...]) -> str:
+        ranges = [fmt_range_pt(a, b, dated) for (a, b) in windows]
         if not ranges:
             return ""
         if len(ranges) == 1:
@@ -198,15 +425,19 @@ def persona_report(payload: OptimizationSchedule = Body(...), persona: Optional[
 
     # Build fact lines used verbatim by the LLM
     windows_lines: List[str] = []
-    for name in sorted(win.keys()):
-        total_e = energy_by_load.get(name, 0.0)
-        pw = sorted(power_values_by_load.get(name, set()))
-        rng = fmt_windows(name)
+    for load in sorted(facts.loads, key=lambda f: f.name):
+        rng = fmt_windows(load.windows)
         windows_lines.append(
-            f"- {name} | janela_otima={rng} | power_kW={pw} | energia_total_kWh={total_e:.1f}"
+            f"- {load.name} | janela_otima={rng} | power_kW={list(load.power_levels)} | energia_total_kWh={load.energy_kwh:.1f}"
         )
 
-    who = pick_persona(persona)
+    # per-day totals and peaks, when the schedule spans several days
+    day_lines: List[str] = []
+    for d in facts.daily if dated else ():
+        at = ", ".join(t.strftime("%Hh%M") for t in d.peak_times)
+        day_lines.append(
+            f"- {fmt_day_pt(d.day)} | energia_kWh={d.total_kwh:.1f} | pico_kW={d.peak_kw:.1f}" + (f" às {at}" if at else "")
+        )
 
     # System prompt: PT-PT, instrutivo, sem inventar números
     system = (
@@ -235,7 +466,7 @@ def persona_report(payload: OptimizationSchedule = Body(...), persona: Optional[
     # Regras fortes: começar EXACTAMENTE com "Olá! Sou {who}, ..."
     # e incluir obrigatoriamente a secção "Custos do dia" copiando as linhas literais.
     user = (
-        f"Começa EXACTAMENTE com: 'Olá! Sou {who}, e estou aqui para indicar os horários ideais de consumo.'\n"
+        f"Começa EXACTAMENTE com: '{opening_line(who)}'\n"
         "Este plano já está OTIMIZADO. Não proponhas mudanças.\n"
         "Escreve ~200 palavras em Português (PT-PT) a explicar a um utilizador doméstico **quando é melhor ligar cada aparelho**, "
         f"Deves manter o rigor técnico, mas introduzir o tom e maneirismos próprios da personagem {who}. "
@@ -245,70 +476,518 @@ def persona_report(payload: OptimizationSchedule = Body(...), persona: Optional[
         "Para cada aparelho, repete fielmente os factos da lista abaixo, incluindo a janela otimizada (formato HHhMM–HHhMM), "
         "e formula no estilo: 'A melhor hora para ligar o [aparelho] é ...'. "
         "Indica apenas a energia total por aparelho (energia_total_kWh). NÃO indiques energia por sessão.\n\n"
+        + (
+            f"O plano cobre {len(facts.daily)} dias: indica sempre o dia de cada janela (formato dia dd/mm HHhMM–HHhMM).\n\n"
+            if dated else ""
+        ) +
         "Factos por aparelho (repete fielmente):\n"
         + "\n".join(windows_lines) + "\n\n"
-        f"Total de energia do dia (kWh): {total_kwh:.1f}\n"
-        f"Pico de potência (kW): {peak_kw:.1f}" + (f" às {hhmm}\n" if hhmm else "\n") +
+        + ("Resumo por dia (repete fielmente):\n" + "\n".join(day_lines) + "\n\n" if day_lines else "")
+        + f"Total de energia {'do período' if dated else 'do dia'} (kWh): {facts.total_kwh:.1f}\n"
+        f"Pico de potência (kW): {facts.peak_kw:.1f}" + (f" às {hhmm}\n" if hhmm else "\n") +
         (
             "\nCopia as linhas abaixo EXACTAMENTE numa secção final com o título 'Custos do dia':\n"
             + "\n".join(f"- {x}" for x in cost_lines) + "\n"
             if cost_lines else "\n(Não há dados de custos para este dia.)\n"
         ) +
-        "\n24h CSV (Hour,Power_W):\n" + csv_24h
+        ("\nCSV horário por dia (Date,Hour,Power_W):\n" if dated else "\n24h CSV (Hour,Power_W):\n")
+        + csv_24h
     )
+    return system, user, cost_lines
+
+OPENER_WINDOW = 160  # chars at the start of a generation searched for the model's own opener
 
-    # ---- Generate report text ----
-    text = generate_text(system, user, max_tokens=420)
+def find_model_opener(text: str, who: str) -> Optional["re.Match"]:
+    """`Olá! Sou {who},` within the first OPENER_WINDOW chars (of the text as strip_markdown leaves it: emphasis allowed)."""
+    pattern = r"[*_]*".join(re.escape(ch) for ch in f"Olá! Sou {who},")
+    window = len(text[:OPENER_WINDOW]) + len(re.findall(r"[*_]", text[:2 * OPENER_WINDOW]))
+    return re.search(pattern, text[:window])
 
-    # ---- Post-process: garantir persona correta e custos presentes ----
-    header_line = f"Olá! Sou {who},"
-    if header_line not in text[:160]:
+def finalize_report_text(text: str, who: str, cost_lines: List[str]) -> str:
+    """Post-process: garantir persona correta e custos presentes."""
+    if find_model_opener(text, who) is None:
         # Prepend mandatory opening if model slipped
-        text = f"{header_line} e estou aqui para indicar os horários ideais de consumo.\n\n{text}"
+        text = f"{opening_line(who)}\n\n{text}"
 
     if cost_lines and "Custos do dia" not in text:
         # Append costs section verbatim if missing
-        text = text.rstrip() + "\n\n## Custos do dia\n" + "\n".join(f"- {x}" for x in cost_lines) + "\n"
+        text = text.rstrip() + "\n\n" + costs_section(cost_lines)
+    return text
 
-    return Response(
-        content=json.dumps({"persona": who, "text": text}, ensure_ascii=False),
-        media_type="application/json",
-    )
+# identical concurrent requests (e.g. text + audio, two dashboard tabs) share one generation
+_report_flights = SingleFlight()
 
-# =============== OpenAI TTS (MP3) ===============
-OPENAI_TTS_MODEL = os.getenv("OPENAI_TTS_MODEL", "gpt-4o-mini-tts")
-OPENAI_TTS_VOICE = os.getenv("OPENAI_TTS_VOICE", "alloy")
-
-def openai_tts_pt_to_mp3(text: str) -> str:
-    """Synthesize Portuguese text into a temp MP3 using OpenAI TTS."""
-    client = OpenAI()
-    fd, path = tempfile.mkstemp(suffix=".mp3"); os.close(fd)
-    with client.audio.speech.with_streaming_response.create(
-        model=OPENAI_TTS_MODEL,
-        voice=OPENAI_TTS_VOICE,
-        input=text,
-    ) as resp:
-        resp.stream_to_file(path)
-    return path
+def report_key(payload: OptimizationSchedule, persona: Optional[str]) -> str:
+    """Normalized payload digest plus requested persona."""
+    return f"{payload.digest()}:{(persona or '').strip()}"
+
+async def _generate_report(payload: OptimizationSchedule, persona: Optional[str]) -> Dict[str, str]:
+    who = pick_persona(persona)
+    system, user, cost_lines = await run_in_threadpool(build_report_prompts, payload, who)  # facts + formatting: off the loop
+    text = await generate_text_async(system, user, max_tokens=420)
+    report = {"persona": who, "text": finalize_report_text(text, who, cost_lines)}
+    report["report_id"] = get_report_store().put(report)
+    return report
+
+async def generate_report(payload: OptimizationSchedule, persona: Optional[str]) -> Dict[str, str]:
+    return await _report_flights.do(report_key(payload, persona), lambda: _generate_report(payload, persona))
+
+@app.post("/persona_report", openapi_extra=body_openapi(OptimizationSchedule), responses=NEGOTIATED)
+async def persona_report(
+    payload: OptimizationSchedule = Depends(schedule_body), persona: Optional[str] = None,
+    respond: Type[Response] = Depends(response_class),
+):
+    report = await generate_report(payload, persona)
+    return respond(report, headers=VARY_ACCEPT)
+
+# =============== Persona report (SSE stream) ===============
+def _strip_model_opener(head: str, who: str, final: bool = False) -> Optional[str]:
+    """
+    The opener is sent before the first model token, but the model is told to repeat it.
+    Given the first streamed characters, return what should follow our opener (the model's
+    opener sentence removed, found as finalize_report_text finds it), or None while undecided.
+    """
+    m = find_model_opener(head, who)
+    if m is None:
+        if len(head) < OPENER_WINDOW and not final:
+            return None  # it may still come
+        return "\n\n" + head if head.strip() else ""
+    # end of the opener sentence, with the emphasis closing it (only known once something else follows)
+    end = re.compile(r"[.\n][*_]*(?=[^*_])" if not final else r"[.\n][*_]*").search(head, m.end())
+    if end is None and len(head) < m.end() + OPENER_WINDOW and not final:
+        return None
+    before = head[:m.start()].rstrip(" *_#")  # e.g. a greeting the model put first
+    rest = head[end.end():] if end else head[m.end():]
+    return ("\n\n" + before.strip() if before.strip() else "") + rest
+
+async def open_llm_stream(system: str, user: str) -> AsyncIterator[str]:
+    """The report's LLM stream with its first delta already received: a failing backend raises here."""
+    deltas = stream_text_async(system, user, max_tokens=420)
+    try:
+        first = await deltas.__anext__()
+    except StopAsyncIteration:
+        return deltas  # empty generation; iterating it again just ends
+    return _prepend(first, deltas)
+
+async def stream_report_text(
+    who: str, system: str, user: str, cost_lines: List[str], llm: Optional["asyncio.Future"] = None,
+) -> AsyncIterator[str]:
+    """
+    Yield the report as text pieces: the mandatory opener first, then model tokens as they arrive
+    (from `llm`, an open_llm_stream already started, if given).
+    """
+    yield opening_line(who)
+    sent: List[str] = []
+    head: Optional[str] = ""
+    deltas = await asyncio.shield(llm) if llm is not None else stream_text_async(system, user, max_tokens=420)
+    async for delta in deltas:
+        if head is None:
+            sent.append(delta); yield delta
+            continue
+        head += delta
+        rest = _strip_model_opener(head, who)
+        if rest is not None:
+            head = None
+            if rest:
+                sent.append(rest); yield rest
+    if head is not None:
+        rest = _strip_model_opener(head, who, final=True)
+        if rest:
+            sent.append(rest); yield rest
+
+    if cost_lines and "Custos do dia" not in "".join(sent):
+        yield "\n\n" + costs_section(cost_lines)
+
+def sse_event(data: dict, event: Optional[str] = None) -> str:
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {orjson.dumps(data).decode('utf-8')}\n\n"
+
+@app.post("/persona_report/stream", openapi_extra=body_openapi(OptimizationSchedule))
+async def persona_report_stream(payload: OptimizationSchedule = Depends(schedule_body), persona: Optional[str] = None):
+    """
+    Server-Sent Events version of /persona_report:
+      event "persona" -> {"persona"}; default events -> {"text": <delta>};
+      event "done" -> {"persona", "text"} (full text); event "error" -> {"error"}.
+    """
+    who = pick_persona(persona)
+    system, user, cost_lines = await run_in_threadpool(build_report_prompts, payload, who)
+
+    async def events() -> AsyncIterator[str]:
+        yield sse_event({"persona": who}, event="persona")
+        parts: List[str] = []
+        try:
+            async for piece in stream_report_text(who, system, user, cost_lines):
+                parts.append(piece)
+                yield sse_event({"text": piece})
+        except Exception as e:
+            yield sse_event({"error": f"LLM failed: {e}"}, event="error")
+            return
+        yield sse_event({"persona": who, "text": "".join(parts)}, event="done")
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 # =============== Audio endpoint (speaks the same text) ===============
-@app.post("/persona_report_audio")
-def persona_report_audio(payload: OptimizationSchedule = Body(...), persona: Optional[str] = None):
+@app.post("/persona_report_audio", openapi_extra=body_openapi(ReportAudioRequest, OptimizationSchedule))
+async def persona_report_audio(
+    body: Union[ReportAudioRequest, OptimizationSchedule] = Depends(audio_body), persona: Optional[str] = None,
+    fmt: AudioFormat = Query("mp3", alias="format"),
+):
     """
-    1) Reuse /persona_report to get EXACT same persona + text.
-    2) Strip Markdown, then synthesize MP3 using OpenAI TTS.
+    1) Take the report to speak: the exact `text` sent, the report stored under `report_id`,
+       or (schedule body, legacy) a new /persona_report generation.
+    2) Strip Markdown, then synthesize it in `format` (MP3 by default) with the TTS backend.
     """
-    resp = persona_report(payload, persona)
-    data = json.loads(resp.body.decode("utf-8"))
+    if isinstance(body, ReportAudioRequest):
+        if body.text:
+            data = {"persona": body.persona or persona or "", "text": body.text}
+        else:
+            data = get_report_store().get(body.report_id)
+            if data is None:
+                return ORJSONResponse({"error": f"unknown or expired report_id: {body.report_id}"}, status_code=404)
+    else:
+        data = await generate_report(body, persona)
+    return await speak_report(data, fmt)
+
+@app.get("/persona_report_audio/{report_id}")
+async def persona_report_audio_by_id(report_id: str, fmt: AudioFormat = Query("mp3", alias="format")):
+    """Short-lived download URL for a stored report's audio (see /persona_report_full)."""
+    data = get_report_store().get(report_id)
+    if data is None:
+        return ORJSONResponse({"error": f"unknown or expired report_id: {report_id}"}, status_code=404)
+    return await speak_report(data, fmt)
+
+def synthesis_format(fmt: str, backend: TTSBackend) -> str:
+    """Format to request from `backend` for a response in `fmt` (WAV is streamed as our header + PCM)."""
+    synth_fmt = "pcm" if fmt == "wav" else fmt
+    if synth_fmt not in backend.formats:
+        raise ValueError(f"format '{fmt}' is not available with TTS backend {backend.name}")
+    return synth_fmt
+
+async def speak_report(data: Dict[str, str], fmt: str = "mp3") -> Response:
+    """Strip Markdown from the report text and synthesize it in `fmt` (one of AUDIO_FORMATS)."""
     raw_text = (data.get("text") or "").strip()
     text = strip_markdown(raw_text)
     if not text:
-        return JSONResponse({"error": "empty text from persona_report"}, status_code=500)
+        return ORJSONResponse({"error": "empty text from persona_report"}, status_code=500)
+
+    try:
+        backend = select_backend()
+    except Exception as e:
+        return ORJSONResponse({"error": f"TTS failed: {e}"}, status_code=500)
+    try:
+        synthesis_format(fmt, backend)
+    except ValueError as e:
+        return ORJSONResponse({"error": str(e)}, status_code=400)
+
+    # same text, backend, voice and format -> same audio: served from disk (Range requests, sendfile where available)
+    cache = get_audio_cache()
+    if cache is not None:
+        path = cache.lookup(audio_cache_key(text, backend.name, backend.voice, fmt), fmt)
+        if path is not None:
+            return FileResponse(path, media_type=media_type(fmt, backend.pcm_rate), filename=f"persona_report.{fmt}")
+
+    plan = tts_plan(text, fmt)
+
+    async def open_audio(backend: TTSBackend) -> AsyncIterator[bytes]:
+        # long texts: chunks synthesized concurrently, TTS latency grows with input length;
+        # the persona opener comes from the phrase cache
+        synth_fmt = synthesis_format(fmt, backend)
+        if len(plan) == 1 and not plan[0][1]:
+            return await backend.stream(text, synth_fmt)
+        return chunked_tts(plan, backend, synth_fmt)
+
+    try:
+        backend, audio = await start_audio(open_audio, backend)
+    except Exception as e:
+        return ORJSONResponse({"error": f"TTS failed: {e}"}, status_code=500)
+    if fmt == "wav":
+        audio = _prepend(wav_header(backend.pcm_rate), audio)
+    if cache is not None:
+        audio = cache.tee(
+            audio_cache_key(text, backend.name, backend.voice, fmt), fmt, audio,
+            finalize=patch_wav_sizes if fmt == "wav" else None,
+        )
+    return audio_response(audio, fmt, backend.pcm_rate)
+
+async def start_audio(
+    open_audio: Callable[[TTSBackend], Awaitable[AsyncIterator[bytes]]], backend: TTSBackend
+) -> Tuple[TTSBackend, AsyncIterator[bytes]]:
+    """
+    Open an audio stream and wait for its first chunk, so failures up to that point can still be
+    retried on TTS_FALLBACK_BACKEND or answered with an error instead of a truncated 200.
+    Returns the backend that produced the audio and the full chunk iterator.
+    """
+    while True:
+        audio = None
+        try:
+            audio = await open_audio(backend)
+            first = await audio.__anext__()
+            break
+        except StopAsyncIteration:
+            first = b""
+            break
+        except Exception:
+            if audio is not None:
+                await audio.aclose()
+            backend = fallback_for(backend)
+            if backend is None:
+                raise
+    return backend, _prepend(first, audio)
+
+async def _prepend(head: T, rest: AsyncIterator[T]) -> AsyncIterator[T]:
+    yield head
+    async for item in rest:
+        yield item
+
+def audio_response(audio: AsyncIterator[bytes], fmt: str = "mp3", rate: int = PCM_RATE) -> StreamingResponse:
+    """Stream audio chunks as they are produced (playback can start before synthesis ends)."""
+    return StreamingResponse(
+        audio,
+        media_type=media_type(fmt, rate),
+        headers={"Content-Disposition": f'attachment; filename="persona_report.{fmt}"'},
+    )
+
+def chunk_text(text: str, max_chars: int = TTS_CHUNK_CHARS) -> List[str]:
+    """
+    Pack whole lines into chunks of at most `max_chars`, cutting a longer line into sentences (a longer
+    sentence is a chunk of its own). Short lines such as "Custo total: 5.17 EUR" are never split.
+    """
+    chunks: List[str] = []
+    current = ""
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    pieces = [p for line in lines for p in ([line] if len(line) <= max_chars else split_sentences(line, final=True)[0])]
+    for sentence in pieces:
+        sentence = sentence.strip()
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            chunks.append(current)
+            current = sentence
+        else:
+            current = f"{current}\n{sentence}" if current else sentence
+    if current:
+        chunks.append(current)
+    return chunks
+
+def tts_plan(text: str, fmt: str = "mp3") -> List[Tuple[str, bool]]:
+    """(text, is_fixed) pieces to synthesize in order: the cached opener, then chunks of the rest."""
+    if fmt not in SPLICEABLE_FORMATS:
+        return [(text, False)]  # containers (Ogg, ADTS, FLAC) can't be joined piecewise: one request
+    plan: List[Tuple[str, bool]] = []
+    for segment, fixed in speech_segments(text):
+        if fixed:
+            plan.append((segment, True))
+        else:
+            plan.extend((chunk, False) for chunk in chunk_text(segment))
+    return plan
+
+async def chunked_tts(
+    plan: List[Tuple[str, bool]], backend: TTSBackend, fmt: str = "mp3", workers: int = TTS_MAX_WORKERS
+) -> AsyncIterator[bytes]:
+    """
+    Synthesize chunks concurrently (at most `workers` TTS requests at a time) and yield them in order
+    as MP3 frames or raw PCM (`fmt`), so the pieces join into one stream without re-encoding.
+    """
+    sem = asyncio.Semaphore(workers)
+
+    async def synth(chunk: str, fixed: bool) -> bytes:
+        if fixed:
+            return await phrase_audio(chunk, backend, fmt)
+        async with sem:
+            return joinable(await backend.synthesize(chunk, fmt), fmt)
+
+    tasks = [asyncio.ensure_future(synth(c, fixed)) for c, fixed in plan]
+    try:
+        for task in tasks:
+            yield await task
+    finally:
+        for task in tasks:
+            task.cancel()
+
+# =============== Phrase audio cache (invariant segments) ===============
+# The persona opener starts every report verbatim (after strip_markdown): its audio is synthesized once and
+# spliced in. The rest stays one text for chunk_text; splicing shorter phrases (heading, cost labels) would
+# make every amount a TTS request of its own and put a join before each number.
+_OPENER_RE = re.compile(r"\s*(" + re.escape(opening_line("\x00")).replace("\x00", r"[^,\n]{1,80}") + r")")
+_phrase_flights = SingleFlight()
+
+def speech_segments(text: str) -> List[Tuple[str, bool]]:
+    """Split spoken text into (segment, is_fixed): a leading persona opener, whose audio is reusable, and the rest."""
+    opener = _OPENER_RE.match(text) if get_audio_cache() is not None else None
+    if opener is None:
+        return [(text, False)]  # no opener, or nowhere to keep its audio
+    rest = text[opener.end():].strip()
+    return [(opener.group(1), True)] + ([(rest, False)] if re.search(r"\w", rest) else [])
+
+def joinable(data: bytes, fmt: str) -> bytes:
+    """Synthesized `fmt` ("mp3" or "pcm") audio in a form that concatenates into one stream."""
+    return audio_frames(data) if fmt == "mp3" else data
+
+async def phrase_audio(phrase: str, backend: TTSBackend, fmt: str = "mp3") -> bytes:
+    """
+    Joinable audio (see `joinable`) for an invariant phrase: synthesized once per backend, voice
+    and format, then read from the audio cache.
+    """
+    cache = get_audio_cache()
+    key = audio_cache_key(phrase, backend.name, backend.voice, fmt)
+    if cache is not None and (data := cache.read(key, fmt)) is not None:
+        return data
+
+    async def synth() -> bytes:
+        data = joinable(await backend.synthesize(phrase, fmt), fmt)
+        if cache is not None:
+            cache.store(key, fmt, data)
+        return data
+    return await _phrase_flights.do(key, synth)
+
+async def prewarm_phrase_audio(personas: List[str]) -> None:
+    """Synthesize the openers of `personas` ahead of the first request."""
+    names = CHARACTERS if [p.lower() for p in personas] == ["all"] else personas
+    phrases = [opening_line(who) for who in names]
+    try:
+        backend = select_backend()
+    except Exception:
+        return  # best effort, like the syntheses below; requests will report the error
+    await asyncio.gather(*[phrase_audio(p, backend) for p in phrases], return_exceptions=True)
+
+# =============== Combined endpoint (one LLM pass, text + audio URL) ===============
+@app.post("/persona_report_full", openapi_extra=body_openapi(OptimizationSchedule), responses=NEGOTIATED)
+async def persona_report_full(
+    payload: OptimizationSchedule = Depends(schedule_body), persona: Optional[str] = None,
+    fmt: AudioFormat = Query("mp3", alias="format"), respond: Type[Response] = Depends(response_class),
+):
+    """
+    Generate the report once and return its text together with `audio_url`, a short-lived
+    (REPORT_STORE_TTL_S) URL that streams the audio (`format`, MP3 by default) of that exact text.
+    """
+    report = await generate_report(payload, persona)
+    audio_url = app.url_path_for("persona_report_audio_by_id", report_id=report["report_id"])
+    if fmt != "mp3":
+        audio_url += f"?format={fmt}"
+    return respond(dict(report, audio_url=audio_url), headers=VARY_ACCEPT)
+
+# =============== Pipelined audio (LLM stream -> per-sentence TTS) ===============
+# sentence end: punctuation followed by whitespace, or a line break; not a colon before a number ("Custo total: 5.17 EUR")
+_SENTENCE_END = re.compile(r"(?<=[.!?…;])\s+|(?<=:)\s+(?!\d)|\n+")
+# punctuation ending the buffer also ends a sentence, unless it may be a decimal point ("5." + "17")
+_SENTENCE_END_AT_TAIL = re.compile(r"(?:[!?…]|(?<!\d)\.)$")
+MIN_SENTENCE_CHARS = 40     # shorter pieces are merged with the next one (TTS prosody suffers on fragments)
+TTS_PIPELINE_DEPTH = 4      # sentences synthesized ahead of the one being played
+
+def split_sentences(buffer: str, final: bool = False) -> Tuple[List[str], str]:
+    """Cut complete sentences off the front of `buffer`. Returns (sentences, unfinished remainder)."""
+    sentences: List[str] = []
+    start = 0
+    for m in _SENTENCE_END.finditer(buffer):
+        if m.end() == len(buffer) and not final and "\n" not in m.group():
+            break  # trailing spaces may still be followed by more of the same sentence
+        if len(buffer[start:m.start()].strip()) >= MIN_SENTENCE_CHARS or "\n\n" in m.group():  # short lines (cost list) stay together
+            sentences.append(buffer[start:m.start()])
+            start = m.end()
+    rest = buffer[start:]
+    if not final and len(rest.strip()) >= MIN_SENTENCE_CHARS and _SENTENCE_END_AT_TAIL.search(rest):
+        sentences.append(rest)
+        rest = ""
+    if final and rest.strip():
+        sentences.append(rest)
+        rest = ""
+    return [s for s in sentences if s.strip()], rest
+
+async def _spoken_sentences(text_pieces: AsyncIterator[str]) -> AsyncIterator[str]:
+    buffer = ""
+    async for piece in text_pieces:
+        buffer += piece
+        sentences, buffer = split_sentences(buffer)
+        for sentence in sentences:
+            if (clean := strip_markdown(sentence).strip()):
+                yield clean
+    for sentence in split_sentences(buffer, final=True)[0]:
+        if (clean := strip_markdown(sentence).strip()):
+            yield clean
+
+async def _sentence_audio(sentence: str, backend: TTSBackend, fmt: str) -> bytes:
+    return joinable(await backend.synthesize(sentence, fmt), fmt)
+
+async def pipelined_tts(
+    text_pieces: AsyncIterator[str], backend: TTSBackend, fmt: str = "mp3"
+) -> AsyncIterator[bytes]:
+    """
+    Synthesize each sentence as soon as the LLM completes it, while later sentences are still
+    being generated, and yield the audio in sentence order.
+    """
+    queue: "asyncio.Queue" = asyncio.Queue(maxsize=TTS_PIPELINE_DEPTH)
+
+    async def produce():
+        try:
+            async for sentence in _spoken_sentences(text_pieces):
+                for segment, fixed in speech_segments(sentence):
+                    synth = phrase_audio(segment, backend, fmt) if fixed else _sentence_audio(segment, backend, fmt)
+                    await queue.put(asyncio.ensure_future(synth))
+            await queue.put(None)
+        except Exception as e:
+            await queue.put(e)
+
+    producer = asyncio.ensure_future(produce())
+    try:
+        while (item := await queue.get()) is not None:
+            if isinstance(item, Exception):
+                raise item
+            yield await item
+    finally:
+        producer.cancel()
+        while not queue.empty():
+            item = queue.get_nowait()
+            if isinstance(item, asyncio.Future):
+                item.cancel()
+
+@app.post("/persona_report_audio/stream", openapi_extra=body_openapi(OptimizationSchedule))
+async def persona_report_audio_stream(
+    payload: OptimizationSchedule = Depends(schedule_body), persona: Optional[str] = None,
+    fmt: AudioFormat = Query("mp3", alias="format"),
+):
+    """
+    Spoken report with TTS overlapped with generation: the opener is synthesized
+    immediately and every later sentence as soon as the LLM finishes it.
+    Only formats that can be joined sentence by sentence (mp3, wav, pcm) are available.
+    """
+    if fmt not in SPLICEABLE_FORMATS:
+        return ORJSONResponse(
+            {"error": f"format '{fmt}' can't be streamed per sentence; use one of {', '.join(SPLICEABLE_FORMATS)}"},
+            status_code=400,
+        )
+    who = pick_persona(persona)
+    system, user, cost_lines = await run_in_threadpool(build_report_prompts, payload, who)
 
     try:
-        mp3_path = openai_tts_pt_to_mp3(text)
+        backend = select_backend()
+        synthesis_format(fmt, backend)
+    except ValueError as e:
+        return ORJSONResponse({"error": str(e)}, status_code=400)
     except Exception as e:
-        return JSONResponse({"error": f"TTS failed: {e}"}, status_code=500)
+        return ORJSONResponse({"error": f"TTS failed: {e}"}, status_code=500)
+
+    # the LLM is asked while the opener is synthesized; its errors are checked apart from the TTS fallback below
+    llm = asyncio.ensure_future(open_llm_stream(system, user))
+    unused = [llm]
 
-    task = BackgroundTask(lambda p=mp3_path: os.path.exists(p) and os.unlink(p))
-    return FileResponse(mp3_path, media_type="audio/mpeg", filename="persona_report.mp3", background=task)
+    async def open_audio(backend: TTSBackend) -> AsyncIterator[bytes]:
+        synth_fmt = synthesis_format(fmt, backend)
+        # a retry on the fallback backend asks the LLM again (the first stream may be partly read)
+        text = stream_report_text(who, system, user, cost_lines, unused.pop() if unused else None)
+        return pipelined_tts(text, backend, synth_fmt)
+
+    try:
+        backend, audio = await start_audio(open_audio, backend)
+    except Exception as e:
+        llm.cancel()
+        return ORJSONResponse({"error": f"TTS failed: {e}"}, status_code=500)
+    try:
+        await llm  # first model delta in: the 200 below won't end in a dropped connection for a dead LLM
+    except Exception as e:
+        await audio.aclose()
+        return ORJSONResponse({"error": f"LLM failed: {e}"}, status_code=500)
+    if fmt == "wav":
+        audio = _prepend(wav_header(backend.pcm_rate), audio)
+    return audio_response(audio, fmt, backend.pcm_rate)
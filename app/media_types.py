@@ -0,0 +1,92 @@
+
+"""
+Binary bodies for machine clients: MessagePack (and CBOR, when the optional cbor2 package is installed)
+as request bodies, chosen by Content-Type, and as responses, chosen by Accept. JSON stays the default
+both ways: a body without a recognised Content-Type is read as JSON, and so is a response to an Accept
+that names none of the binary types.
+
+Decoded documents have the same shape as the JSON ones. Timestamps may also be sent natively
+(MessagePack timestamp extension, CBOR tags 0/1); they are read as timezone-aware datetimes.
+"""
+import io
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+import msgpack
+from fastapi.responses import ORJSONResponse, Response
+
+try:
+    import cbor2
+except ImportError:  # optional: CBOR is only offered when cbor2 is installed
+    cbor2 = None
+
+JSON, MSGPACK, CBOR = "application/json", "application/msgpack", "application/cbor"
+# other names MessagePack goes by
+_ALIASES = {"application/x-msgpack": MSGPACK, "application/vnd.msgpack": MSGPACK}
+
+BODY_MEDIA_TYPES: Tuple[str, ...] = (JSON, MSGPACK) + ((CBOR,) if cbor2 is not None else ())
+
+def parse_media_type(header: Optional[str]) -> str:
+    """The bare, lower-case media type of a Content-Type value or Accept entry (parameters dropped)."""
+    mt = (header or "").split(";", 1)[0].strip().lower()
+    return _ALIASES.get(mt, mt)
+
+def load_binary(raw: bytes, media: str) -> Any:
+    """Document of a MessagePack or CBOR body; ValueError if it isn't one well-formed item."""
+    if media == MSGPACK:
+        return msgpack.unpackb(raw, timestamp=3)  # ValueError subclasses on bad or trailing data
+    if media == CBOR and cbor2 is not None:
+        fp = io.BytesIO(raw)
+        try:
+            doc = cbor2.CBORDecoder(fp).decode()
+        except cbor2.CBORDecodeError as e:
+            raise ValueError(str(e)) from e
+        if fp.tell() != len(raw):
+            raise ValueError(f"extra data after the CBOR item ({len(raw) - fp.tell()} bytes)")
+        return doc
+    raise ValueError(f"unsupported media type: {media}")
+
+# ====== Responses ======
+class MsgpackResponse(Response):
+    media_type = MSGPACK
+
+    def render(self, content: Any) -> bytes:
+        return msgpack.packb(content)
+
+class CBORResponse(Response):
+    media_type = CBOR
+
+    def render(self, content: Any) -> bytes:
+        return cbor2.dumps(content)
+
+_RESPONSES: Dict[str, Type[Response]] = {JSON: ORJSONResponse, MSGPACK: MsgpackResponse, "application/*": ORJSONResponse, "*/*": ORJSONResponse}
+if cbor2 is not None:
+    _RESPONSES[CBOR] = CBORResponse
+
+RESPONSE_MEDIA_TYPES: Tuple[str, ...] = tuple(t for t in _RESPONSES if "*" not in t)
+
+def q_value(params: List[str]) -> float:
+    """The q of an Accept / Accept-Encoding entry from its `;`-separated parameters (1 if absent)."""
+    for p in params:
+        key, _, value = p.partition("=")
+        if key.strip().lower() == "q":
+            try:
+                return float(value)
+            except ValueError:
+                return 0.0
+    return 1.0
+
+def negotiate(accept: Optional[str]) -> Type[Response]:
+    """
+    Response class for an Accept header: the supported type with the highest q (an exact type before
+    a wildcard at the same q, then the first listed). JSON when none is supported or Accept is absent.
+    """
+    best, rank = ORJSONResponse, (0.0, False)
+    for entry in (accept or "").split(","):
+        mt, *params = entry.split(";")
+        response = _RESPONSES.get(parse_media_type(mt))
+        if response is None:
+            continue
+        q = q_value(params)
+        if q > 0 and (q, "*" not in mt) > rank:  # q=0: not acceptable
+            best, rank = response, (q, "*" not in mt)
+    return best
@@ -0,0 +1,71 @@
+
+"""
+Minimal MPEG audio frame handling, enough to concatenate separately synthesized MP3s
+without re-encoding: tags and VBR info frames are dropped, audio frames are kept as-is.
+"""
+from typing import Iterator, Optional, Tuple
+
+# kbps by bitrate index, per (MPEG version 1?, layer)
+_BITRATES = {
+    (True, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (True, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (True, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (False, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (False, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (False, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+# Hz by sample-rate index, per version bits (0: MPEG 2.5, 2: MPEG 2, 3: MPEG 1)
+_SAMPLE_RATES = {0: (11025, 12000, 8000), 2: (22050, 24000, 16000), 3: (44100, 48000, 32000)}
+
+def _frame_info(data: bytes, pos: int) -> Optional[Tuple[int, int]]:
+    """(frame length, offset of the Xing/Info tag) for a valid frame header at `pos`, else None."""
+    if pos + 4 > len(data) or data[pos] != 0xFF or (data[pos + 1] & 0xE0) != 0xE0:
+        return None
+    b1, b2, b3 = data[pos + 1], data[pos + 2], data[pos + 3]
+    version, layer_bits = (b1 >> 3) & 3, (b1 >> 1) & 3
+    br_idx, sr_idx, pad = b2 >> 4, (b2 >> 2) & 3, (b2 >> 1) & 1
+    if version == 1 or layer_bits == 0 or br_idx in (0, 15) or sr_idx == 3:
+        return None
+    v1, layer = version == 3, 4 - layer_bits
+    bitrate = _BITRATES[(v1, layer)][br_idx] * 1000
+    rate = _SAMPLE_RATES[version][sr_idx]
+    if layer == 1:
+        length = (12 * bitrate // rate + pad) * 4
+    else:
+        length = (144 if (layer == 2 or v1) else 72) * bitrate // rate + pad
+    mono = (b3 >> 6) == 3
+    side_info = (17 if mono else 32) if v1 else (9 if mono else 17)
+    return length, 4 + side_info
+
+def _skip_id3v2(data: bytes) -> int:
+    if data[:3] != b"ID3" or len(data) < 10:
+        return 0
+    size = (data[6] & 0x7F) << 21 | (data[7] & 0x7F) << 14 | (data[8] & 0x7F) << 7 | (data[9] & 0x7F)
+    footer = 10 if data[5] & 0x10 else 0
+    return 10 + size + footer
+
+def iter_frames(data: bytes) -> Iterator[Tuple[int, int]]:
+    """(offset, length) of each audio frame, skipping ID3 tags, VBR info frames and junk bytes."""
+    end = len(data) - 128 if data[-128:-125] == b"TAG" else len(data)  # ID3v1 trailer
+    pos = _skip_id3v2(data)
+    while pos + 4 <= end:
+        info = _frame_info(data, pos)
+        # require the next header to line up too, so sync-like bytes inside junk aren't taken as frames
+        if info is None or (pos + info[0] < end and _frame_info(data, pos + info[0]) is None) or pos + info[0] > end:
+            pos += 1
+            continue
+        length, tag_at = info
+        if data[pos + tag_at:pos + tag_at + 4] not in (b"Xing", b"Info") and data[pos + 36:pos + 40] != b"VBRI":
+            yield pos, length
+        pos += length
+
+def audio_frames(data: bytes) -> bytes:
+    """Only the audio frames of an MP3 file; such outputs can be concatenated into one valid stream."""
+    return b"".join(data[off:off + length] for off, length in iter_frames(data))
+
+# MPEG-1 Layer III, 128 kbps, 44.1 kHz, mono; all-zero side info decodes as silence
+_SILENT_FRAME = b"\xff\xfb\x90\xc0" + b"\x00" * 413
+
+def silent_frames(n: int) -> bytes:
+    """`n` frames (~26 ms each) of silent MP3, e.g. for stand-in TTS backends."""
+    return _SILENT_FRAME * n
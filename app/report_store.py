@@ -0,0 +1,37 @@
+
+import os, json, hashlib
+from typing import Dict, Optional
+
+from .caching import SqliteLRU, process_wide
+from .llm_cache import LLM_CACHE_PATH
+
+REPORT_STORE_PATH = os.getenv("REPORT_STORE_PATH", LLM_CACHE_PATH)  # a file all workers open, so any of them finds a report
+REPORT_STORE_MAX_ENTRIES = int(os.getenv("REPORT_STORE_MAX_ENTRIES", "10000"))
+REPORT_STORE_TTL_S = float(os.getenv("REPORT_STORE_TTL_S", "3600"))
+
+def report_id_for(persona: str, text: str) -> str:
+    """Content address of a generated report (same persona + text -> same id)."""
+    return hashlib.sha256(f"{persona}\0{text}".encode("utf-8")).hexdigest()[:32]
+
+class ReportStore:
+    """
+    Recently generated reports by id, so follow-up calls (audio) can reuse the exact text, on any worker:
+    the `reports` table of an SQLite file they share. Least-recently-used entries beyond `max_entries`,
+    or older than `ttl_s`, are dropped.
+    """
+
+    def __init__(self, path: str = REPORT_STORE_PATH, max_entries: int = REPORT_STORE_MAX_ENTRIES,
+                 ttl_s: float = REPORT_STORE_TTL_S):
+        self._table = SqliteLRU(path, "reports", max_entries, ttl_s)
+
+    def put(self, report: Dict[str, str]) -> str:
+        report_id = report_id_for(report["persona"], report["text"])
+        self._table.put(report_id, json.dumps({"persona": report["persona"], "text": report["text"]}, ensure_ascii=False))
+        return report_id
+
+    def get(self, report_id: str) -> Optional[Dict[str, str]]:
+        stored = self._table.get(report_id)
+        return json.loads(stored) if stored is not None else None
+
+# process-wide store, opened on first use (in the worker, not in a parent that forks it)
+get_report_store = process_wide(True, ReportStore)
@@ -0,0 +1,61 @@
+
+"""
+Fast path for the per-slot `schedule` payload: the decoded body (orjson, MessagePack or CBOR)
+checked by hand and read straight into a ScheduleMatrix, instead of one pydantic ScheduleSlot/DataItem
+per entry.
+
+Only input whose meaning is unambiguous is taken (ISO 8601 or native timestamps, numeric kW values,
+string names); anything else gives None and goes to pydantic, whose coercions and error messages remain
+the reference. Slots are sorted by timestamp (stable, like the model validator) only when they
+aren't in order already.
+"""
+import re
+from datetime import datetime
+from typing import Any, List, Optional
+
+import numpy as np
+
+from .facts import ScheduleMatrix
+
+# the ISO 8601 forms pydantic and datetime.fromisoformat read the same way
+_ISO_TIMESTAMP = re.compile(r"\d{4}-\d{2}-\d{2}(?:[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d{1,6})?)?(?:Z|[+-]\d{2}:\d{2})?)?")
+
+def parse_timestamp(value: Any) -> Optional[datetime]:
+    if type(value) is datetime:  # native MessagePack/CBOR timestamp
+        return value
+    if type(value) is not str or not _ISO_TIMESTAMP.fullmatch(value):
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:  # e.g. month 13, hour 24
+        return None
+
+def is_sorted(times: List[datetime]) -> bool:
+    return all(a <= b for a, b in zip(times, times[1:]))
+
+def slots_matrix(slots: Any) -> Optional[ScheduleMatrix]:
+    """ScheduleMatrix of a decoded `schedule` list, in timestamp order; None if it needs pydantic."""
+    if type(slots) is not list:
+        return None
+    try:
+        times = [parse_timestamp(slot["timestamp"]) for slot in slots]
+        data = [slot.get("data", []) for slot in slots]
+        if any(t is None for t in times) or any(type(d) is not list for d in data):
+            return None
+        if not is_sorted(times):
+            order = sorted(range(len(times)), key=times.__getitem__)
+            times, data = [times[i] for i in order], [data[i] for i in order]
+        names = [it["name"] for d in data for it in d]
+        values = [it["value"] for d in data for it in d]
+    except (TypeError, KeyError, AttributeError):  # not objects, missing keys, naive and aware timestamps mixed
+        return None
+    if not {type(n) for n in names} <= {str} or not {type(v) for v in values} <= {int, float}:
+        return None
+    try:
+        value = np.array(values, dtype=float)
+    except OverflowError:  # integers beyond float range
+        return None
+    index: dict = {}
+    col = np.fromiter((index.setdefault(n, len(index)) for n in names), dtype=np.int64, count=len(names))
+    row = np.repeat(np.arange(len(data)), [len(d) for d in data])
+    return ScheduleMatrix(times, list(index), row, col, value)
@@ -0,0 +1,301 @@
+
+import abc, os, json, time, shutil, struct, asyncio, httpx
+from typing import AsyncIterator, BinaryIO, Callable, Dict, Iterator, Optional, Tuple
+from openai import OpenAI, AsyncOpenAI, DefaultHttpxClient, DefaultAsyncHttpxClient
+
+from .mp3 import silent_frames
+
+TTS_BACKEND = os.getenv("TTS_BACKEND", "OPENAI").upper()
+# Used instead of TTS_BACKEND for TTS_FALLBACK_COOLDOWN_S seconds after it fails (e.g. API outage)
+TTS_FALLBACK_BACKEND = os.getenv("TTS_FALLBACK_BACKEND", "").upper()
+TTS_FALLBACK_COOLDOWN_S = float(os.getenv("TTS_FALLBACK_COOLDOWN_S", "30"))
+
+OPENAI_TTS_MODEL = os.getenv("OPENAI_TTS_MODEL", "gpt-4o-mini-tts")
+OPENAI_TTS_VOICE = os.getenv("OPENAI_TTS_VOICE", "alloy")
+OPENAI_TTS_TIMEOUT = float(os.getenv("OPENAI_TTS_TIMEOUT", "60"))
+# Connection pool shared by every TTS request of this process
+OPENAI_TTS_MAX_CONNECTIONS = int(os.getenv("OPENAI_TTS_MAX_CONNECTIONS", "100"))
+OPENAI_TTS_KEEPALIVE = int(os.getenv("OPENAI_TTS_KEEPALIVE", "20"))
+
+TTS_CHUNK_BYTES = 16 * 1024
+# Long texts are split into chunks of about this many characters, synthesized concurrently
+TTS_CHUNK_CHARS = int(os.getenv("TTS_CHUNK_CHARS", "400"))
+TTS_MAX_WORKERS = int(os.getenv("TTS_MAX_WORKERS", "4"))
+
+# =============== Audio formats ===============
+# `format` values of the audio endpoints. "wav" is served as a streaming header + "pcm" from the backend.
+AUDIO_FORMATS = ("mp3", "opus", "aac", "flac", "wav", "pcm")
+# Formats whose separately synthesized pieces join into one stream (chunking, phrase cache, pipeline)
+SPLICEABLE_FORMATS = ("mp3", "wav", "pcm")
+PCM_RATE = 24000  # OpenAI "pcm": 16-bit signed little-endian mono samples at 24 kHz
+
+def media_type(fmt: str, rate: int = PCM_RATE) -> str:
+    return {
+        "mp3": "audio/mpeg", "opus": "audio/ogg", "aac": "audio/aac", "flac": "audio/flac", "wav": "audio/wav",
+        "pcm": f"audio/pcm;rate={rate};channels=1",
+    }[fmt]
+
+_WAV_UNKNOWN_SIZE = 0xFFFFFFFF
+
+def wav_header(rate: int, data_bytes: int = _WAV_UNKNOWN_SIZE) -> bytes:
+    """44-byte header for 16-bit mono PCM; with the default (unknown) size it can precede a live stream."""
+    riff = _WAV_UNKNOWN_SIZE if data_bytes == _WAV_UNKNOWN_SIZE else 36 + data_bytes
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI", b"RIFF", riff, b"WAVE", b"fmt ", 16, 1, 1, rate, rate * 2, 2, 16, b"data", data_bytes
+    )
+
+def patch_wav_sizes(f: BinaryIO, size: int) -> None:
+    """Write the final sizes into a streamed WAV file of `size` bytes (see wav_header)."""
+    f.seek(4)
+    f.write(struct.pack("<I", size - 8))
+    f.seek(40)
+    f.write(struct.pack("<I", size - 44))
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(max_connections=OPENAI_TTS_MAX_CONNECTIONS, max_keepalive_connections=OPENAI_TTS_KEEPALIVE)
+
+# Created on first use (the constructor needs OPENAI_API_KEY), then reused so
+# configuration is read once and TLS connections stay warm across requests.
+_client: Optional[OpenAI] = None
+_async_client: Optional[AsyncOpenAI] = None
+
+def get_tts_client() -> OpenAI:
+    global _client
+    if _client is None:
+        _client = OpenAI(timeout=OPENAI_TTS_TIMEOUT, http_client=DefaultHttpxClient(limits=_limits()))
+    return _client
+
+def get_async_tts_client() -> AsyncOpenAI:
+    global _async_client
+    if _async_client is None:
+        _async_client = AsyncOpenAI(timeout=OPENAI_TTS_TIMEOUT, http_client=DefaultAsyncHttpxClient(limits=_limits()))
+    return _async_client
+
+async def aclose_tts_clients() -> None:
+    global _client, _async_client
+    if _async_client is not None:
+        await _async_client.close()
+        _async_client = None
+    if _client is not None:
+        _client.close()
+        _client = None
+
+def openai_tts_pt_stream(text: str, fmt: str = "mp3") -> Iterator[bytes]:
+    """
+    Start synthesizing Portuguese text with OpenAI TTS and return an iterator over audio chunks
+    (MP3 by default) as they arrive. The request is sent here, so API errors raise before any byte is served.
+    """
+    stream = get_tts_client().audio.speech.with_streaming_response.create(
+        model=OPENAI_TTS_MODEL,
+        voice=OPENAI_TTS_VOICE,
+        input=text,
+        response_format=fmt,
+    )
+    resp = stream.__enter__()
+
+    def chunks() -> Iterator[bytes]:
+        try:
+            yield from resp.iter_bytes(TTS_CHUNK_BYTES)
+        finally:
+            stream.__exit__(None, None, None)
+    return chunks()
+
+async def openai_tts_pt_stream_async(text: str, fmt: str = "mp3") -> AsyncIterator[bytes]:
+    """Async counterpart of openai_tts_pt_stream (no thread held while audio streams)."""
+    stream = get_async_tts_client().audio.speech.with_streaming_response.create(
+        model=OPENAI_TTS_MODEL,
+        voice=OPENAI_TTS_VOICE,
+        input=text,
+        response_format=fmt,
+    )
+    resp = await stream.__aenter__()
+
+    async def chunks() -> AsyncIterator[bytes]:
+        try:
+            async for chunk in resp.iter_bytes(TTS_CHUNK_BYTES):
+                yield chunk
+        finally:
+            await stream.__aexit__(None, None, None)
+    return chunks()
+
+async def openai_tts_pt_bytes_async(text: str, fmt: str = "mp3") -> bytes:
+    """Whole audio file for a short text (e.g. one sentence)."""
+    return b"".join([chunk async for chunk in await openai_tts_pt_stream_async(text, fmt)])
+
+# =============== Backends ===============
+class TTSBackend:
+    """
+    One TTS engine. `name` and `voice` identify its output in the audio caches; `formats` are the
+    AUDIO_FORMATS it produces itself ("wav" never: it is built from "pcm" at `pcm_rate`).
+    """
+    name = ""
+    voice = ""
+    formats: Tuple[str, ...] = ("mp3",)
+    pcm_rate = PCM_RATE
+
+    async def stream(self, text: str, fmt: str = "mp3") -> AsyncIterator[bytes]:
+        """Start synthesis and return an iterator over audio chunks; errors raise before it is returned."""
+        data = await self.synthesize(text, fmt)
+
+        async def chunks() -> AsyncIterator[bytes]:
+            yield data
+        return chunks()
+
+    async def synthesize(self, text: str, fmt: str = "mp3") -> bytes:
+        """Whole audio for `text`, MP3 by default."""
+        return b"".join([chunk async for chunk in await self.stream(text, fmt)])
+
+    async def aclose(self) -> None:
+        pass
+
+class OpenAITTS(TTSBackend):
+    formats = ("mp3", "opus", "aac", "flac", "pcm")
+
+    def __init__(self):
+        self.name, self.voice = f"openai:{OPENAI_TTS_MODEL}", OPENAI_TTS_VOICE
+
+    async def stream(self, text: str, fmt: str = "mp3") -> AsyncIterator[bytes]:
+        return await openai_tts_pt_stream_async(text, fmt)
+
+    async def aclose(self) -> None:
+        await aclose_tts_clients()
+
+PIPER_BIN = os.getenv("PIPER_BIN", "piper")
+PIPER_MODEL = os.getenv("PIPER_MODEL", "pt_PT-tugão-medium.onnx")
+ESPEAK_BIN = os.getenv("ESPEAK_BIN", "espeak-ng")
+ESPEAK_VOICE = os.getenv("ESPEAK_VOICE", "pt")  # European Portuguese ("pt-br" for Brazilian)
+FFMPEG_BIN = os.getenv("FFMPEG_BIN", "ffmpeg")
+
+async def _run(args: list, stdin: bytes) -> bytes:
+    proc = await asyncio.create_subprocess_exec(
+        *args, stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+    )
+    out, err = await proc.communicate(stdin)
+    if proc.returncode != 0:
+        raise RuntimeError(f"{os.path.basename(args[0])} exited with {proc.returncode}: {err.decode(errors='replace')[-300:]}")
+    return out
+
+def _require(binary: str, what: str) -> str:
+    path = shutil.which(binary)
+    if path is None:
+        raise RuntimeError(f"{what} needs '{binary}' on PATH")
+    return path
+
+def wav_to_pcm(wav: bytes) -> Tuple[bytes, int]:
+    """(16-bit mono PCM, sample rate) from a RIFF/WAVE file, tolerating streamed (unknown) sizes."""
+    if wav[:4] != b"RIFF" or wav[8:12] != b"WAVE":
+        raise RuntimeError("not a WAV file")
+    pos, rate = 12, 0
+    while pos + 8 <= len(wav):
+        cid, size = wav[pos:pos + 4], struct.unpack("<I", wav[pos + 4:pos + 8])[0]
+        if cid == b"fmt ":
+            rate = struct.unpack("<I", wav[pos + 12:pos + 16])[0]
+        elif cid == b"data":
+            return wav[pos + 8:pos + 8 + size], rate
+        pos += 8 + size + (size & 1)
+    raise RuntimeError("WAV without data chunk")
+
+# ffmpeg output options per compressed format
+_FFMPEG_ENCODE = {
+    "mp3": ["-f", "mp3", "-b:a", "64k"],
+    "opus": ["-f", "ogg", "-c:a", "libopus", "-b:a", "32k"],
+    "aac": ["-f", "adts", "-c:a", "aac", "-b:a", "64k"],
+    "flac": ["-f", "flac"],
+}
+
+class LocalTTS(TTSBackend, abc.ABC):
+    """Offline engine producing PCM at `pcm_rate`; other formats are encoded with ffmpeg."""
+    formats = ("mp3", "opus", "aac", "flac", "pcm")
+
+    @abc.abstractmethod
+    async def pcm(self, text: str) -> bytes:
+        """16-bit mono PCM of `text` at `pcm_rate`."""
+
+    async def synthesize(self, text: str, fmt: str = "mp3") -> bytes:
+        if fmt == "pcm":
+            return await self.pcm(text)
+        ffmpeg = _require(FFMPEG_BIN, f"{self.name} ({fmt} output)")
+        return await _run(
+            [ffmpeg, "-loglevel", "error", "-f", "s16le", "-ar", str(self.pcm_rate), "-ac", "1", "-i", "pipe:0",
+             *_FFMPEG_ENCODE[fmt], "pipe:1"],
+            await self.pcm(text),
+        )
+
+class PiperTTS(LocalTTS):
+    def __init__(self):
+        self.name, self.voice = "piper", os.path.basename(PIPER_MODEL)
+        self.bin = _require(PIPER_BIN, "TTS_BACKEND=PIPER")
+        try:
+            with open(f"{PIPER_MODEL}.json", encoding="utf-8") as f:
+                self.pcm_rate = int(json.load(f)["audio"]["sample_rate"])
+        except (OSError, KeyError, ValueError):
+            self.pcm_rate = 22050
+
+    async def pcm(self, text: str) -> bytes:
+        return await _run([self.bin, "--model", PIPER_MODEL, "--output_raw"], text.encode("utf-8"))
+
+class EspeakTTS(LocalTTS):
+    pcm_rate = 22050  # espeak-ng's fixed output rate
+
+    def __init__(self):
+        self.name, self.voice = "espeak-ng", ESPEAK_VOICE
+        self.bin = _require(ESPEAK_BIN, "TTS_BACKEND=ESPEAK")
+
+    async def pcm(self, text: str) -> bytes:
+        return wav_to_pcm(await _run([self.bin, "-v", ESPEAK_VOICE, "--stdout", "--stdin"], text.encode("utf-8")))[0]
+
+TTS_STUB_LATENCY_S = float(os.getenv("TTS_STUB_LATENCY_S", "0"))
+TTS_STUB_CHAR_LATENCY_S = float(os.getenv("TTS_STUB_CHAR_LATENCY_S", "0"))
+
+class StubTTS(TTSBackend):
+    """Deterministic stand-in for benchmarks and offline tests: silence, ~13 ms per character."""
+    formats = ("mp3", "pcm")
+
+    def __init__(self):
+        self.name, self.voice = "stub", "silence"
+
+    async def synthesize(self, text: str, fmt: str = "mp3") -> bytes:
+        await asyncio.sleep(TTS_STUB_LATENCY_S + TTS_STUB_CHAR_LATENCY_S * len(text))
+        frames = max(1, len(text) // 2)  # one 1152-sample MP3 frame at 44.1 kHz per 2 characters
+        if fmt == "pcm":
+            return b"\0\0" * (frames * 1152 * self.pcm_rate // 44100)
+        return silent_frames(frames)
+
+REGISTRY: Dict[str, Callable[[], TTSBackend]] = {
+    "OPENAI": OpenAITTS,
+    "PIPER": PiperTTS,
+    "ESPEAK": EspeakTTS,
+    "STUB": StubTTS,
+}
+
+def register_backend(name: str, factory: Callable[[], TTSBackend]) -> None:
+    REGISTRY[name.upper()] = factory
+
+_backends: Dict[str, TTSBackend] = {}
+_failed_at: Dict[str, float] = {}
+
+def get_backend(name: str = TTS_BACKEND) -> TTSBackend:
+    name = name.upper()
+    if name not in _backends:
+        if name not in REGISTRY:
+            raise RuntimeError(f"Unsupported TTS_BACKEND: {name}")
+        _backends[name] = REGISTRY[name]()
+    return _backends[name]
+
+def select_backend() -> TTSBackend:
+    """TTS_BACKEND, or TTS_FALLBACK_BACKEND while the primary is cooling down after a failure."""
+    if TTS_FALLBACK_BACKEND and time.monotonic() - _failed_at.get(TTS_BACKEND, -1e9) < TTS_FALLBACK_COOLDOWN_S:
+        return get_backend(TTS_FALLBACK_BACKEND)
+    return get_backend(TTS_BACKEND)
+
+def fallback_for(backend: TTSBackend) -> Optional[TTSBackend]:
+    """Record that `backend` failed; return the backend to retry with, if any."""
+    if not TTS_FALLBACK_BACKEND or backend is _backends.get(TTS_FALLBACK_BACKEND):
+        return None
+    _failed_at[TTS_BACKEND] = time.monotonic()
+    return get_backend(TTS_FALLBACK_BACKEND)
+
+async def aclose_backends() -> None:
+    for backend in _backends.values():
+        await backend.aclose()
+    _backends.clear()
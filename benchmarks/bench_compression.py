@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Content-Encoding on the wire: examples/example_schedule.json scaled to a week (each slot repeated at
+--step-min), sent as identity, gzip (as hems_client.py --compress gzip) and zstd. Reports body size,
+client compress and server decompress time (app.compression), and the upload time those add up to on
+a --mbps link; then the same for a report response as the middleware compresses it.
+
+    python -m benchmarks.bench_compression --days 7 --step-min 1 --mbps 20
+"""
+import argparse, gzip, json, time
+from datetime import datetime, timedelta
+
+import orjson
+import zstandard
+
+from app.compression import compress, decompress
+
+EXAMPLE = "examples/example_schedule.json"
+
+def scaled_schedule(days: int, step_min: int) -> dict:
+    """The example day repeated `days` times, each 15-minute slot split into `step_min` slots."""
+    doc = json.load(open(EXAMPLE, encoding="utf-8"))
+    slots = [(datetime.fromisoformat(s["timestamp"]), s["data"]) for s in doc["schedule"]]
+    return {"schedule": [
+        {"timestamp": (t + timedelta(days=d, minutes=k)).isoformat(sep=" "), "data": data}
+        for d in range(days) for t, data in slots for k in range(0, 15, step_min)
+    ], "cost_analysis": doc["cost_analysis"]}
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t)
+    return best * 1000
+
+def table(label: str, body: bytes, packers: dict, mbps: float, repeat: int) -> None:
+    print(f"{label}:")
+    for coding, pack in packers.items():
+        packed = pack(body) if pack else body
+        if pack:
+            assert decompress(packed, coding) == body
+        pack_ms = best_of(lambda: pack(body), repeat) if pack else 0.0
+        unpack_ms = best_of(lambda: decompress(packed, coding), repeat) if pack else 0.0
+        wire_ms = len(packed) * 8 / (mbps * 1e6) * 1000
+        print(f"  {coding:>8}: {len(packed) / 1024:8.1f} KiB ({len(body) / len(packed):5.1f}x) | compress {pack_ms:6.1f} ms"
+              f" | decompress {unpack_ms:5.1f} ms | {mbps:g} Mbit/s {wire_ms:7.1f} ms | total {pack_ms + wire_ms + unpack_ms:7.1f} ms")
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--days", type=int, default=7)
+    ap.add_argument("--step-min", type=int, default=1, choices=(1, 3, 5, 15), help="slot length in minutes")
+    ap.add_argument("--mbps", type=float, default=20.0, help="link speed for the transfer estimate")
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    from app.main import build_report_prompts, decode_schedule
+    doc = scaled_schedule(args.days, args.step_min)
+    body = json.dumps(doc, allow_nan=False).encode("utf-8")  # what hems_client.py sends
+    print(f"{len(doc['schedule'])} slots ({args.days} days at {args.step_min} min), "
+          f"decode {best_of(lambda: decode_schedule(body), args.repeat):.1f} ms whatever the coding")
+    table("request (client level: gzip 9, zstd 3)", body, {
+        "identity": None, "gzip": gzip.compress, "zstd": zstandard.ZstdCompressor().compress,
+    }, args.mbps, args.repeat)
+
+    # a long report: the facts the model is given for this schedule, as a /persona_report body
+    _, user, _ = build_report_prompts(decode_schedule(body), "Sherlock Holmes")
+    report = orjson.dumps({"persona": "Sherlock Holmes", "text": user, "report_id": "0" * 32})
+    table("response (server levels, app.compression)", report, {
+        "identity": None, "gzip": lambda b: compress(b, "gzip"), "zstd": lambda b: compress(b, "zstd"),
+    }, args.mbps, args.repeat)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Decoding a per-slot `schedule` body: pydantic (OptimizationSchedule.model_validate_json, then the
+ScheduleMatrix the facts engine reads) vs the fast path (app.main.decode_schedule: orjson plus hand
+checks straight into the matrix), on sorted and shuffled input. orjson.loads alone is the floor.
+
+    python -m benchmarks.bench_decode --loads 50 --step-min 1 --days 1
+"""
+import argparse, json, random, time, tracemalloc
+from datetime import datetime, timedelta
+
+def body(n: int, loads: int, step_min: float, shuffle: bool) -> bytes:
+    rnd = random.Random(1)
+    t0 = datetime(2025, 9, 9)
+    schedule = [
+        {"timestamp": (t0 + timedelta(minutes=step_min * i)).isoformat(),
+         "data": [{"name": f"load {j}", "value": rnd.choice([0.5, 1.2, 1.8, 2.25, 3.0])} for j in range(loads) if (i // 30 + j) % 3]}
+        for i in range(n)
+    ]
+    if shuffle:
+        rnd.shuffle(schedule)
+    return json.dumps({"schedule": schedule, "cost_analysis": {"total_cost": 5.17, "currency": "EUR"}}).encode()
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--loads", type=int, default=50)
+    ap.add_argument("--step-min", type=float, default=1.0, help="slot length in minutes")
+    ap.add_argument("--days", type=int, default=1)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    import orjson
+    from app.main import OptimizationSchedule, decode_schedule
+
+    def with_pydantic(raw: bytes):
+        payload = OptimizationSchedule.model_validate_json(raw)
+        payload.matrix()
+        return payload
+
+    n = int(args.days * 24 * 60 / args.step_min)
+    for shuffle in (False, True):
+        raw = body(n, args.loads, args.step_min, shuffle)
+        print(f"{n} slots x {args.loads} loads, {'shuffled' if shuffle else 'sorted'}: {len(raw) / 2**20:.2f} MiB")
+        a, b = with_pydantic(raw), decode_schedule(raw)
+        assert a.digest() == b.digest() and a.facts() == b.facts(), "decoders disagree"
+        for label, fn in (("orjson.loads", orjson.loads), ("pydantic", with_pydantic), ("fast path", decode_schedule)):
+            best = float("inf")
+            for _ in range(args.repeat):
+                t = time.perf_counter()
+                fn(raw)
+                best = min(best, time.perf_counter() - t)
+            tracemalloc.start()
+            kept = fn(raw)
+            held = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            del kept
+            print(f"{label:>14}: {best * 1000:8.1f} ms | held {held / 2**20:6.1f} MiB")
+
+if __name__ == "__main__":
+    main()
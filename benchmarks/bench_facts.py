@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Fact derivation for the report prompt: the per-slot Python loops it replaced vs the
+columnar NumPy engine (app/facts.compute_facts), on a synthetic 1-minute schedule.
+With --days > 1 the loops' hour-of-day buckets mix days, so only timings and memory are compared.
+
+    python -m benchmarks.bench_facts --loads 120 --step-min 1
+    python -m benchmarks.bench_facts --loads 40 --step-min 1 --days 7
+"""
+import argparse, random, time, tracemalloc
+from datetime import datetime, timedelta
+from typing import Dict, List, Set
+
+def baseline(payload, slot_h: float):
+    """What build_report_prompts used to do: three walks over the slots, strftime and sets per slot."""
+    power_by_ts: Dict[str, float] = {}
+    energy_by_load: Dict[str, float] = {}
+    for slot in payload.schedule:
+        ts_str = slot.timestamp.strftime("%Y-%m-%d %H:%M:%S")
+        p_sum = 0.0
+        for it in slot.data:
+            val_kw = float(it.value)
+            p_sum += val_kw
+            energy_by_load[it.name] = energy_by_load.get(it.name, 0.0) + val_kw * slot_h
+        power_by_ts[ts_str] = p_sum
+    total_kwh = round(sum(energy_by_load.values()), 3)
+    peak = max(power_by_ts.values()) if power_by_ts else 0.0
+    peak_ts = [ts for ts, p in power_by_ts.items() if abs(p - peak) < 1e-9]
+    per_hour = {h: 0.0 for h in range(24)}
+    for ts, p_kw in power_by_ts.items():
+        per_hour[int(ts[11:13])] += float(p_kw) * slot_h * 1000.0  # was a hardcoded 0.25 h
+
+    windows: Dict[str, List[tuple]] = {}
+    active: Dict[str, datetime] = {}
+    for i, slot in enumerate(payload.schedule):
+        ts = slot.timestamp
+        present: Set[str] = {it.name for it in slot.data}
+        for name in list(active):
+            if name not in present:
+                windows.setdefault(name, []).append((active.pop(name), ts))
+        for it in slot.data:
+            active.setdefault(it.name, ts)
+        if i == len(payload.schedule) - 1:
+            for name, st in active.items():
+                windows.setdefault(name, []).append((st, ts + timedelta(hours=slot_h)))
+
+    levels: Dict[str, Set[float]] = {}
+    for slot in payload.schedule:
+        for it in slot.data:
+            levels.setdefault(it.name, set()).add(float(it.value))
+    return energy_by_load, total_kwh, round(peak, 3), peak_ts, per_hour, windows, {k: sorted(v) for k, v in levels.items()}
+
+def vectorized(payload):
+    """compute_facts, reshaped like `baseline` for the equality check."""
+    from app.facts import compute_facts
+    f = compute_facts(payload.matrix())
+    return (
+        {l.name: l.energy_kwh for l in f.loads}, f.total_kwh, f.peak_kw,
+        [t.strftime("%Y-%m-%d %H:%M:%S") for t in f.peak_times], dict(enumerate(f.hourly_wh[0])),
+        {l.name: list(l.windows) for l in f.loads}, {l.name: list(l.power_levels) for l in f.loads},
+    )
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--loads", type=int, default=120)
+    ap.add_argument("--step-min", type=float, default=1.0, help="slot length in minutes")
+    ap.add_argument("--days", type=int, default=1, help="schedule length in days")
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    from app.main import OptimizationSchedule
+    rnd = random.Random(1)
+    n = int(args.days * 24 * 60 / args.step_min)
+    t0 = datetime(2025, 9, 9)
+    levels = [0.5, 1.2, 1.8, 2.25, 3.0]
+    schedule = [
+        {"timestamp": (t0 + timedelta(minutes=args.step_min * i)).isoformat(),
+         "data": [{"name": f"load {j}", "value": rnd.choice(levels)} for j in range(args.loads) if (i // 30 + j) % 3]}
+        for i in range(n)
+    ]
+    payload = OptimizationSchedule(schedule=schedule)
+    items = sum(len(s.data) for s in payload.schedule)
+    print(f"{n} slots x {args.loads} loads ({items} items)")
+
+    slot_h = args.step_min * 60 / 3600
+    if args.days == 1:
+        assert vectorized(payload) == baseline(payload, slot_h), "engines disagree"
+    for label, fn in (("python loops", lambda: baseline(payload, slot_h)), ("numpy", lambda: vectorized(payload))):
+        best = float("inf")
+        for _ in range(args.repeat):
+            t = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - t)
+        tracemalloc.start()
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{label:>14}: {best * 1000:8.1f} ms | peak {peak / 2**20:6.1f} MiB")
+
+if __name__ == "__main__":
+    main()
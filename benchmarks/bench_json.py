@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+JSON encode/decode of batch-sized bodies: the stdlib (json.dumps(ensure_ascii=False), as the
+reports used to be written, and Starlette's JSONResponse) vs orjson (ORJSONResponse, the app's
+default). Bodies: a batch of PT-PT reports, week-long facts (hourly Wh, windows, levels) and a
+1-minute schedule request. Also checks the encoders agree on every string, byte for byte.
+
+    python -m benchmarks.bench_json --reports 200 --loads 50 --days 7
+"""
+import argparse, json, random, time
+from datetime import datetime, timedelta
+
+import orjson
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+SENTENCE = (
+    "A melhor hora para ligar o Aquecimento da Estufa é às 05h00–09h30, com 1.8 kW e 8.1 kWh no total; "
+    "a máquina de lavar fica para as 13h15–14h45, quando a produção solar é máxima. "
+)
+
+def bodies(n_reports: int, loads: int, days: int) -> dict:
+    rnd = random.Random(1)
+    t0 = datetime(2025, 9, 9)
+    reports = [
+        {"persona": "Sherlock Holmes", "text": "Olá! Sou Sherlock Holmes. " + SENTENCE * 8,
+         "report_id": f"{rnd.getrandbits(128):032x}", "audio_url": f"/persona_report_audio/{i:032x}"}
+        for i in range(n_reports)
+    ]
+    facts = {
+        "days": [(t0 + timedelta(days=d)).date().isoformat() for d in range(days)],
+        "hourly_wh": [[round(rnd.random() * 5000, 1) for _ in range(24)] for _ in range(days)],
+        "loads": [
+            {"name": f"Aparelho {j} (divisão)", "energy_kwh": rnd.random() * 40, "power_levels": [0.5, 1.8, 2.25],
+             "windows": [[(t0 + timedelta(minutes=90 * k)).isoformat(), (t0 + timedelta(minutes=90 * k + 45)).isoformat()]
+                         for k in range(days * 16)]}
+            for j in range(loads)
+        ],
+    }
+    schedule = {"schedule": [
+        {"timestamp": (t0 + timedelta(minutes=i)).isoformat(),
+         "data": [{"name": f"Aparelho {j}", "value": rnd.choice([0.5, 1.2, 1.8, 2.25, 3.0])} for j in range(loads) if (i // 30 + j) % 3]}
+        for i in range(24 * 60)
+    ]}
+    return {"reports": {"reports": reports}, "facts": facts, "schedule": schedule}
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t)
+    return best * 1000
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--reports", type=int, default=200, help="reports in the batch body")
+    ap.add_argument("--loads", type=int, default=50)
+    ap.add_argument("--days", type=int, default=7, help="days of facts")
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    for name, body in bodies(args.reports, args.loads, args.days).items():
+        stdlib = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        fast = orjson.dumps(body)
+        assert json.loads(fast) == json.loads(stdlib), f"{name}: encoders disagree"
+        # compact stdlib output is the same bytes (only float exponents may be spelled differently)
+        assert name != "reports" or fast == json.dumps(body, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        print(f"{name} ({len(fast) / 2**20:.2f} MiB):")
+        print(f"  encode  json.dumps {best_of(lambda: json.dumps(body, ensure_ascii=False).encode('utf-8'), args.repeat):7.2f} ms"
+              f" | JSONResponse {best_of(lambda: JSONResponse(body), args.repeat):7.2f} ms"
+              f" | ORJSONResponse {best_of(lambda: ORJSONResponse(body), args.repeat):7.2f} ms")
+        print(f"  decode  json.loads {best_of(lambda: json.loads(stdlib), args.repeat):7.2f} ms"
+              f" | orjson.loads {best_of(lambda: orjson.loads(fast), args.repeat):7.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Per-call overhead of the LLM adapter: a new httpx client (and connection) per call vs the pooled
+AsyncClient that generate_text_async shares, with `--concurrency` calls in flight like a busy server.
+
+    python -m benchmarks.bench_llm_pool --backend VLLM -n 2000 --concurrency 16
+"""
+import argparse, asyncio, os, statistics, time
+
+from benchmarks.standin import serve_llm
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--backend", default="OLLAMA", choices=["OLLAMA", "VLLM", "TGI"])
+    ap.add_argument("-n", type=int, default=1000, help="calls per variant")
+    ap.add_argument("--concurrency", type=int, default=8, help="calls in flight at a time")
+    args = ap.parse_args()
+
+    server, base = serve_llm()
+    os.environ["LLAMA_BACKEND"] = args.backend
+    os.environ["LLAMA_ENDPOINT"] = base
+    os.environ["LLM_CACHE_ENABLED"] = "0"  # time the HTTP round trip, not SQLite hits
+    import httpx
+    from app import llama_adapter
+
+    async def unpooled(system, prompt, max_tokens=512, temperature=0.2):
+        # Baseline: a fresh client per call (new TCP connection each time)
+        url, payload = llama_adapter._build_request(system, prompt, max_tokens, temperature)
+        async with httpx.AsyncClient(timeout=llama_adapter.LLAMA_TIMEOUT) as client:
+            r = await client.post(url, json=payload); r.raise_for_status()
+        return llama_adapter._parse_response(r.json())
+
+    async def run(fn):
+        await fn("sys", "warmup")
+        lat = []
+        sem = asyncio.Semaphore(args.concurrency)
+
+        async def one():
+            async with sem:
+                t = time.perf_counter()
+                await fn("sys", "prompt")
+                lat.append((time.perf_counter() - t) * 1e6)
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(args.n)))
+        return lat, time.perf_counter() - t0
+
+    async def bench():
+        for label, fn in [("client per call", unpooled), ("pooled client", llama_adapter.generate_text_async)]:
+            lat, wall = await run(fn)
+            lat.sort()
+            print(f"{label:>15}: mean {statistics.fmean(lat):8.1f} us | p50 {lat[len(lat) // 2]:8.1f} us | "
+                  f"p99 {lat[int(len(lat) * 0.99)]:8.1f} us | {args.n / wall:8.0f} calls/s")
+        await llama_adapter.aclose_async_client()
+
+    asyncio.run(bench())
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Request bodies as JSON vs MessagePack vs CBOR (when cbor2 is installed), for each payload shape of
+bench_payload: body size and decode time into OptimizationSchedule (app.main.decode_schedule, as the
+endpoints read them). Also checks that every format gives the same schedule digest.
+
+    python -m benchmarks.bench_media --loads 50 --step-min 1 --days 1
+    python -m benchmarks.bench_media --loads 50 --step-min 15 --days 7 --run-min 60
+"""
+import argparse, json, time
+
+import msgpack
+
+from benchmarks.bench_payload import payloads
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--loads", type=int, default=50)
+    ap.add_argument("--step-min", type=float, default=1.0, help="slot length in minutes")
+    ap.add_argument("--days", type=int, default=1)
+    ap.add_argument("--run-min", type=float, default=30.0, help="minutes each load stays at one kW level")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    from app.main import decode_schedule
+    from app.media_types import CBOR, JSON, MSGPACK, cbor2
+    n = int(args.days * 24 * 60 / args.step_min)
+    print(f"{n} slots x {args.loads} loads")
+    for shape, raw in payloads(n, args.loads, args.step_min, max(1, int(args.run_min / args.step_min))).items():
+        doc = json.loads(raw)
+        bodies = {JSON: raw, MSGPACK: msgpack.packb(doc)}
+        if cbor2 is not None:
+            bodies[CBOR] = cbor2.dumps(doc)
+        digest = None
+        for media, body in bodies.items():
+            best = float("inf")
+            for _ in range(args.repeat):
+                t = time.perf_counter()
+                payload = decode_schedule(body, media)
+                best = min(best, time.perf_counter() - t)
+            digest = digest or payload.digest()
+            assert payload.digest() == digest, f"{shape} as {media}: different schedule"
+            print(f"{shape:>9} {media.split('/')[1]:>8}: {len(body) / 2**20:6.2f} MiB | decode {best * 1000:7.1f} ms")
+
+if __name__ == "__main__":
+    main()
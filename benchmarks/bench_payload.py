@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Request payload cost by shape: the per-slot `schedule` list vs the compact `columns` form
+(dense `values` matrix, or per-load `series`) vs run `windows`, for the same synthetic schedule.
+Reports JSON size, parse time into OptimizationSchedule, memory allocated by the parse, and
+parse + facts. --run-min sets how long each load keeps one kW level (windows scale with runs).
+
+    python -m benchmarks.bench_payload --loads 50 --step-min 1 --days 1
+    python -m benchmarks.bench_payload --loads 50 --step-min 1 --days 7 --run-min 60
+"""
+import argparse, json, random, time, tracemalloc
+from datetime import datetime, timedelta
+
+def payloads(n: int, loads: int, step_min: float, run_slots: int):
+    """The same schedule in each accepted shape (JSON bytes)."""
+    rnd = random.Random(1)
+    t0 = datetime(2025, 9, 9)
+    names = [f"load {j}" for j in range(loads)]
+    levels = [0.5, 1.2, 1.8, 2.25, 3.0]
+    run_kw = [[rnd.choice(levels) for _ in range(n // run_slots + 1)] for _ in range(loads)]
+    values = [[run_kw[j][i // run_slots] if (i // run_slots + j) % 3 else None for j in range(loads)] for i in range(n)]
+    windows = []
+    for j, name in enumerate(names):
+        i = 0
+        while i < n:
+            v, k = values[i][j], i
+            while k < n and values[k][j] == v:
+                k += 1
+            if v is not None:
+                windows.append({"name": name, "value": v, "start": (t0 + timedelta(minutes=step_min * i)).isoformat(),
+                                "end": (t0 + timedelta(minutes=step_min * k)).isoformat()})
+            i = k
+    schedule = [
+        {"timestamp": (t0 + timedelta(minutes=step_min * i)).isoformat(),
+         "data": [{"name": name, "value": v} for name, v in zip(names, row) if v is not None]}
+        for i, row in enumerate(values)
+    ]
+    start = t0.isoformat()
+    return {
+        "schedule": json.dumps({"schedule": schedule}).encode(),
+        "columns": json.dumps({"columns": {"start": start, "step_minutes": step_min, "loads": names, "values": values}}).encode(),
+        "series": json.dumps({"columns": {"start": start, "step_minutes": step_min, "series": {
+            name: [row[j] for row in values] for j, name in enumerate(names)}}}).encode(),
+        "windows": json.dumps({"windows": windows}).encode(),
+    }
+
+def summary(facts):
+    """What the report states, comparable across shapes: loads sorted by name (their order follows
+    first appearance), sums to 1e-6 (added in a different order), peak kW (windows give run starts)."""
+    return (
+        sorted((l.name, round(l.energy_kwh, 6), l.power_levels, l.windows) for l in facts.loads),
+        round(facts.total_kwh, 6), facts.peak_kw, [[round(wh, 6) for wh in day] for day in facts.hourly_wh],
+    )
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--loads", type=int, default=50)
+    ap.add_argument("--step-min", type=float, default=1.0, help="slot length in minutes")
+    ap.add_argument("--days", type=int, default=1)
+    ap.add_argument("--run-min", type=float, default=30.0, help="minutes each load stays at one kW level")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    from app.main import OptimizationSchedule
+    n = int(args.days * 24 * 60 / args.step_min)
+    print(f"{n} slots x {args.loads} loads")
+    reference = None
+    for shape, raw in payloads(n, args.loads, args.step_min, max(1, int(args.run_min / args.step_min))).items():
+        parse = best = float("inf")
+        for _ in range(args.repeat):
+            t = time.perf_counter()
+            payload = OptimizationSchedule.model_validate_json(raw)
+            parse = min(parse, time.perf_counter() - t)
+            facts = payload.facts()
+            best = min(best, time.perf_counter() - t)
+        facts = summary(facts)
+        reference = reference or facts
+        assert facts == reference, f"{shape}: facts differ"
+        tracemalloc.start()
+        payload = OptimizationSchedule.model_validate_json(raw)
+        held, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del payload
+        print(f"{shape:>9}: {len(raw) / 2**20:6.2f} MiB JSON | parse {parse * 1000:7.1f} ms | "
+              f"held {held / 2**20:6.1f} MiB (peak {peak / 2**20:6.1f}) | parse + facts {best * 1000:7.1f} ms")
+
+if __name__ == "__main__":
+    main()
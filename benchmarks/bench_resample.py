@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Resampling a long schedule's total power into Wh per calendar-day bin: a per-slot Python
+loop vs app.facts.energy_bins, for 15-min, hourly and daily bins.
+
+    python -m benchmarks.bench_resample --days 30 --step-min 1
+"""
+import argparse, time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from app.facts import energy_bins
+
+def loop_bins(starts, seconds: float, kw, bin_s: int):
+    """Reference: each slot split at bin edges by hand, Wh accumulated per (day, bin)."""
+    wh = defaultdict(float)
+    for t, p in zip(starts, kw):
+        begin, end = t, t + timedelta(seconds=seconds)
+        while begin < end:
+            midnight = datetime(begin.year, begin.month, begin.day)
+            b = int((begin - midnight).total_seconds() // bin_s)
+            edge = min(end, midnight + timedelta(seconds=(b + 1) * bin_s))
+            wh[(begin.date(), b)] += p * ((edge - begin).total_seconds() / 3600.0) * 1000.0
+            begin = edge
+    return wh
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--days", type=int, default=30)
+    ap.add_argument("--step-min", type=float, default=1.0, help="slot length in minutes")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    n = int(args.days * 24 * 60 / args.step_min)
+    seconds = args.step_min * 60
+    rnd = np.random.default_rng(1)
+    wall = np.datetime64("2025-09-01T00:00:00") + (np.arange(n) * seconds).astype("timedelta64[s]")
+    kw = rnd.choice([0.0, 0.5, 1.8, 3.0, 7.4], size=n)
+    starts = wall.tolist()
+    print(f"{n} slots of {args.step_min:g} min over {args.days} days")
+
+    for label, bin_s in (("15-min", 900), ("hourly", 3600), ("daily", 86400)):
+        days, wh = energy_bins(wall, np.full(n, seconds), kw, bin_s)
+        ref = loop_bins(starts, seconds, kw.tolist(), bin_s)
+        assert np.allclose([ref.get((d, b), 0.0) for d in days.tolist() for b in range(wh.shape[1])], wh.ravel())
+        timings = []
+        for fn in (lambda: loop_bins(starts, seconds, kw.tolist(), bin_s), lambda: energy_bins(wall, np.full(n, seconds), kw, bin_s)):
+            best = float("inf")
+            for _ in range(args.repeat):
+                t = time.perf_counter()
+                fn()
+                best = min(best, time.perf_counter() - t)
+            timings.append(best * 1000)
+        print(f"{label:>7} ({wh.shape[0]} days x {wh.shape[1]} bins): python loop {timings[0]:8.1f} ms | numpy {timings[1]:6.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Latency and throughput of each TTS backend in the registry, on the same sentence.
+Backends that can't run here (missing binary, model or ffmpeg) are skipped. OPENAI
+talks to a local stand-in unless --live is given (then OPENAI_API_KEY is used).
+
+    python -m benchmarks.bench_tts_backends -n 20 --concurrency 4
+"""
+import argparse, asyncio, os, statistics, time
+
+from benchmarks.standin import serve_tts
+
+TEXT = "A melhor hora para ligar o Greenhouse Heating é 05h00–09h30, com 1.8 kW e 8.1 kWh no total."
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("-n", type=int, default=20, help="syntheses per backend")
+    ap.add_argument("--concurrency", type=int, default=4, help="in-flight syntheses for the throughput run")
+    ap.add_argument("--backends", default="", help="comma-separated subset of the registry (default: all)")
+    ap.add_argument("--live", action="store_true", help="benchmark the real OpenAI API instead of the stand-in")
+    ap.add_argument("--delay-ms", type=float, default=150.0, help="stand-in latency per request")
+    ap.add_argument("--per-char-ms", type=float, default=1.5, help="stand-in latency per input character")
+    args = ap.parse_args()
+
+    server = None
+    if not args.live:
+        server, base = serve_tts(delay_s=args.delay_ms / 1000, per_char_s=args.per_char_ms / 1000)
+        os.environ["OPENAI_BASE_URL"] = f"{base}/v1"
+        os.environ.setdefault("OPENAI_API_KEY", "sk-standin")
+    from app.tts_adapter import REGISTRY, get_backend, aclose_backends
+    from app.mp3 import iter_frames
+
+    names = [n.strip().upper() for n in args.backends.split(",") if n.strip()] or list(REGISTRY)
+
+    async def first_chunk(backend) -> float:
+        t = time.perf_counter()
+        audio = await backend.stream(TEXT)
+        await audio.__anext__()
+        ttfb = time.perf_counter() - t
+        async for _ in audio:
+            pass
+        return ttfb
+
+    async def bench():
+        for name in names:
+            try:
+                backend = get_backend(name)
+                frames = sum(1 for _ in iter_frames(await backend.synthesize(TEXT)))  # warm-up, and checks output
+            except Exception as e:
+                print(f"{name:>8}: skipped ({e})")
+                continue
+            ttfb, lat = [], []
+            for _ in range(args.n):
+                t = time.perf_counter()
+                ttfb.append(await first_chunk(backend))
+                lat.append(time.perf_counter() - t)
+            sem = asyncio.Semaphore(args.concurrency)
+
+            async def one():
+                async with sem:
+                    await backend.synthesize(TEXT)
+            t = time.perf_counter()
+            await asyncio.gather(*[one() for _ in range(args.n)])
+            wall = time.perf_counter() - t
+            print(f"{name:>8} ({backend.name}/{backend.voice}): first chunk p50 {statistics.median(ttfb) * 1000:7.1f} ms | "
+                  f"total p50 {statistics.median(lat) * 1000:7.1f} ms | {args.n / wall:6.1f} syntheses/s "
+                  f"at concurrency {args.concurrency} | {frames} MP3 frames")
+        await aclose_backends()
+
+    asyncio.run(bench())
+    if server is not None:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Wall time to synthesize a long report: one TTS request vs parallel sentence chunks
+joined at MP3 frame level. The stand-in's latency grows linearly with input length.
+
+    python -m benchmarks.bench_tts_chunking --per-char-ms 1.5
+"""
+import argparse, asyncio, os, time
+
+from benchmarks.standin import serve_tts
+
+PARAGRAPH = (
+    "Olá! Sou Gandalf the Grey, e estou aqui para indicar os horários ideais de consumo. "
+    "A melhor hora para ligar o Greenhouse Heating é 05h00–09h30, com 1.8 kW e 8.1 kWh no total. "
+    "O Spa Pool Heater deve funcionar entre as 11h00–16h00, a 3.0 kW, somando 15.0 kWh. "
+    "Para a Electric Sauna, a janela ótima é 20h00–22h00, a 8.0 kW, totalizando 16.0 kWh.\n"
+)
+COSTS = (
+    "Custos do dia\n- Custo total: 5.17 EUR\n- Custo dos consumos: 5.27 EUR\n- Receita solar: 0.10 EUR\n"
+    "- Custo líquido (consumos - receita solar): 5.17 EUR\n"
+)
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--paragraphs", type=int, default=4, help="report length, in paragraphs of ~330 chars")
+    ap.add_argument("--delay-ms", type=float, default=150.0, help="fixed stand-in latency per request")
+    ap.add_argument("--per-char-ms", type=float, default=1.5, help="stand-in latency per input character")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    server, base = serve_tts(delay_s=args.delay_ms / 1000, per_char_s=args.per_char_ms / 1000)
+    os.environ["OPENAI_BASE_URL"] = f"{base}/v1"
+    os.environ.setdefault("OPENAI_API_KEY", "sk-standin")
+    os.environ.setdefault("AUDIO_CACHE_ENABLED", "0")
+    from app import main as app_main
+    from app.tts_adapter import get_backend, openai_tts_pt_bytes_async, aclose_tts_clients
+    from app.mp3 import iter_frames
+
+    text = PARAGRAPH * args.paragraphs + COSTS
+    chunks = app_main.chunk_text(text)
+    print(f"{len(text)} chars -> {len(chunks)} chunks of <= {app_main.TTS_CHUNK_CHARS} chars")
+
+    async def single() -> bytes:
+        return await openai_tts_pt_bytes_async(text)
+
+    def chunked(workers: int):
+        async def run() -> bytes:
+            plan = [(c, False) for c in chunks]
+            return b"".join([c async for c in app_main.chunked_tts(plan, get_backend("OPENAI"), workers=workers)])
+        return run
+
+    async def bench():
+        variants = [("single request", single)] + [(f"chunked, {w} workers", chunked(w)) for w in (1, 2, 4, 8)]
+        for label, fn in variants:
+            best, frames = float("inf"), 0
+            for _ in range(args.repeat):
+                t = time.perf_counter()
+                audio = await fn()
+                best = min(best, time.perf_counter() - t)
+                frames = sum(1 for _ in iter_frames(audio))
+            print(f"{label:>20}: {best * 1000:8.1f} ms | {frames} MP3 frames")
+        await aclose_tts_clients()
+
+    asyncio.run(bench())
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Per-request TTS overhead: a new OpenAI() client per call vs the shared pooled clients.
+
+    python -m benchmarks.bench_tts_client -n 300
+"""
+import argparse, asyncio, os, statistics, time
+
+from benchmarks.standin import serve_tts
+
+TEXT = "Olá! Sou Sherlock Holmes, e estou aqui para indicar os horários ideais de consumo."
+
+def report(label: str, lat: list, wall: float):
+    lat.sort()
+    print(f"{label:>22}: mean {statistics.fmean(lat):8.1f} us | p50 {lat[len(lat) // 2]:8.1f} us | "
+          f"p99 {lat[int(len(lat) * 0.99)]:8.1f} us | {len(lat) / wall:7.0f} req/s")
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("-n", type=int, default=300, help="requests per variant")
+    ap.add_argument("--concurrency", type=int, default=32, help="in-flight requests for the async variant")
+    args = ap.parse_args()
+
+    server, base = serve_tts()
+    os.environ["OPENAI_BASE_URL"] = f"{base}/v1"
+    os.environ.setdefault("OPENAI_API_KEY", "sk-standin")
+    from openai import OpenAI
+    from app import tts_adapter
+
+    def per_call_client():
+        # Baseline: what openai_tts_pt_to_mp3 used to do
+        client = OpenAI()
+        with client.audio.speech.with_streaming_response.create(
+            model=tts_adapter.OPENAI_TTS_MODEL, voice=tts_adapter.OPENAI_TTS_VOICE, input=TEXT
+        ) as resp:
+            for _ in resp.iter_bytes(tts_adapter.TTS_CHUNK_BYTES):
+                pass
+
+    def shared_client():
+        for _ in tts_adapter.openai_tts_pt_stream(TEXT):
+            pass
+
+    for label, fn in [("new client per call", per_call_client), ("shared sync client", shared_client)]:
+        fn()
+        lat = []
+        t0 = time.perf_counter()
+        for _ in range(args.n):
+            t = time.perf_counter(); fn(); lat.append((time.perf_counter() - t) * 1e6)
+        report(label, lat, time.perf_counter() - t0)
+
+    async def run_async():
+        sem = asyncio.Semaphore(args.concurrency)
+        lat = []
+
+        async def one():
+            async with sem:
+                t = time.perf_counter()
+                async for _ in await tts_adapter.openai_tts_pt_stream_async(TEXT):
+                    pass
+                lat.append((time.perf_counter() - t) * 1e6)
+
+        await one()
+        lat.clear()
+        t0 = time.perf_counter()
+        await asyncio.gather(*[one() for _ in range(args.n)])
+        report(f"shared async (x{args.concurrency})", lat, time.perf_counter() - t0)
+        await tts_adapter.aclose_tts_clients()
+
+    asyncio.run(run_async())
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
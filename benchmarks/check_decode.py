@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Differential check of the fast schedule decoder (app.main.decode_schedule) against pydantic
+(OptimizationSchedule.model_validate_json): random per-slot bodies (tz offsets, shuffled slots,
+repeated timestamps, a load twice in a slot) and hand-written odd ones (numeric strings, booleans,
+Unix times, bad timestamps, malformed JSON, ...). Both must accept the same bodies, with the same
+schedule digest, facts and cost analysis, and reject the rest with the same errors.
+
+    python -m benchmarks.check_decode --cases 300
+"""
+import argparse, json, random, sys
+from datetime import datetime, timedelta
+from typing import Any, Iterator, List, Tuple
+
+ODD: List[bytes] = [
+    b'', b'[]', b'null', b'{}', b'not json', b'{"schedule": null}', b'{"schedule": {}}',
+    b'{"schedule":[{"timestamp":"2025-09-09T00:00:00","data":[{"name":"a","value":true}]}]}',
+    b'{"schedule":[{"timestamp":"2025-09-09T00:00:00","data":[{"name":"a","value":"1.5"}]}]}',
+    b'{"schedule":[{"timestamp":"2025-09-09T00:00:00","data":[{"name":"a","value":"x"}]}]}',
+    b'{"schedule":[{"timestamp":"2025-09-09T00:00:00","data":[{"name":1,"value":1}]}]}',
+    b'{"schedule":[{"timestamp":"2025-09-09T00:00:00","data":[{"name":"a"}]}]}',
+    b'{"schedule":[{"timestamp":"2025-09-09T00:00:00","data":[{"name":"a","value":1e400}]}]}',
+    b'{"schedule":[{"timestamp":"2025-09-09T00:00:00","data":[{"name":"a","value":1' + b'0' * 330 + b'}]}]}',
+    b'{"schedule":[{"timestamp":"2025-09-09T00:00:00","data":[["a",1]]}]}',
+    b'{"schedule":[{"timestamp":"2025-09-09T00:00:00","data":null}]}',
+    b'{"schedule":[{"data":[]}]}',
+    b'{"schedule":[{"timestamp":1700000000,"data":[{"name":"a","value":1}]}]}',
+    b'{"schedule":[{"timestamp":"2025-09-09T24:00:00","data":[]}]}',
+    b'{"schedule":[{"timestamp":"2025-09-09t00:00:00z","data":[]}]}',
+    b'{"schedule":[{"timestamp":"2025-09-09T00:00:00.1234567","data":[]}]}',
+    b'{"schedule":[{"timestamp":"2025-09-09T00:00:00+0100","data":[]}]}',
+    b'{"schedule":[{"timestamp":"2025-09-09","data":[]},{"timestamp":"2025-09-09T00:30","data":[]}]}',
+    b'{"schedule":[{"timestamp":"2025-09-09T00:00:00Z","data":[]},{"timestamp":"2025-09-09T00:15:00","data":[]}]}',
+    b'{"schedule":[{"timestamp":"2025-09-09T00:00:00","data":[],"extra":1}],"other":2}',
+    b'{"schedule":[], "cost_analysis": {"total_cost": "abc"}}',
+    b'{"schedule":[], "cost_analysis": {"total_cost": "1.5"}}',
+    b'{"schedule":[], "columns": null}',
+]
+
+def bodies(cases: int, seed: int) -> Iterator[bytes]:
+    rnd = random.Random(seed)
+    for k in range(cases):
+        step, n = rnd.choice([1, 5, 15, 60]), rnd.randint(0, 400)
+        tz = rnd.choice(["", "Z", "+01:00", "-03:30"])
+        t0 = datetime(2025, 9, 9, rnd.randrange(24))
+        schedule = []
+        for i in range(n):
+            data = [{"name": f"L{j}", "value": rnd.choice([0, 1, 0.5, 1.8, 2.25, rnd.random() * 5])}
+                    for j in range(rnd.randint(0, 6)) if rnd.random() < 0.7]
+            if data and rnd.random() < 0.02:
+                data.append(dict(data[0]))  # the same load twice in a slot
+            schedule.append({"timestamp": (t0 + timedelta(minutes=step * i)).isoformat(sep=rnd.choice("T ")) + tz, "data": data})
+        if k % 4 == 0:
+            rnd.shuffle(schedule)
+        if k % 7 == 0 and n > 2:
+            schedule[1]["timestamp"] = schedule[0]["timestamp"]
+        doc: dict = {"schedule": schedule}
+        if k % 3 == 0:
+            doc["cost_analysis"] = {"total_cost": rnd.random(), "currency": "EUR"}
+        yield json.dumps(doc).encode()
+    yield from ODD
+
+def outcome(decode, raw: bytes) -> Tuple[Any, Any]:
+    """(payload, None) or (None, the error as compared: ValidationError details, else the type name)."""
+    from pydantic import ValidationError
+    try:
+        return decode(raw), None
+    except ValidationError as e:
+        return None, e.errors(include_url=False)
+    except Exception as e:
+        return None, type(e).__name__
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--cases", type=int, default=300, help="random bodies, besides the hand-written ones")
+    ap.add_argument("--seed", type=int, default=22)
+    args = ap.parse_args()
+
+    from app.main import OptimizationSchedule, decode_schedule
+    total = bad = fast = 0
+    for raw in bodies(args.cases, args.seed):
+        total += 1
+        (a, ea), (b, eb) = outcome(OptimizationSchedule.model_validate_json, raw), outcome(decode_schedule, raw)
+        if a is None or b is None:
+            same = str(ea) == str(eb)
+        else:
+            same = a.digest() == b.digest() and a.facts() == b.facts() and a.cost_analysis == b.cost_analysis
+            fast += b._matrix is not None and not b.schedule  # read straight into the matrix
+        if not same:
+            bad += 1
+            print(f"differs: {raw[:120]!r}\n  pydantic: {str(ea)[:200]}\n  fast:     {str(eb)[:200]}")
+    print(f"{total - bad}/{total} bodies decoded alike ({fast} accepted on the fast path)")
+    sys.exit(1 if bad else 0)
+
+if __name__ == "__main__":
+    main()
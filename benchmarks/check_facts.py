@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Equivalence check for the facts engine (app/facts.compute_facts) on random single-day schedules with
+repeated timestamps, repeated loads in a slot and shuffled slots:
+
+- against the per-slot loops it replaced (benchmarks.bench_facts.baseline), always;
+- with --against REV, the /persona_report prompts of this tree vs those of git revision REV, byte for
+  byte, on 15-minute schedules. REV is checked out in a temporary worktree and the LLM is stubbed out
+  on both sides.
+
+    python -m benchmarks.check_facts --cases 400
+    python -m benchmarks.check_facts --cases 400 --against b60eaee
+"""
+import argparse, json, os, random, subprocess, sys, tempfile
+from datetime import datetime, timedelta
+from typing import Iterator, Sequence
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROMPT_STEPS = (15,)  # the baseline took every slot as 15 minutes, so only those prompts can match it
+
+def payloads(cases: int, seed: int, steps: Sequence[int] = (1, 5, 15)) -> Iterator[dict]:
+    rnd = random.Random(seed)
+    for k in range(cases):
+        step = rnd.choice(steps)
+        n = rnd.choice([1, 4, 30, 24 * 60 // step])
+        t0 = datetime(2025, 9, 9)
+        loads = [f"L{i}" for i in range(rnd.randrange(1, 8))]
+        schedule = []
+        for i in range(n):
+            j = i if i < 2 or rnd.random() > 0.1 else i - 1  # ~10% repeated timestamps, after the two the slot length is read from
+            data = [{"name": l, "value": rnd.choice([0.0, 0.5, 1.8, 2.25, 3.0, rnd.random() * 7])}
+                    for l in loads if rnd.random() < 0.6]
+            if data and rnd.random() < 0.02:
+                data.append(dict(data[0]))  # the same load twice in a slot
+            schedule.append({"timestamp": (t0 + timedelta(minutes=step * j)).isoformat(sep=rnd.choice("T ")), "data": data})
+        if k % 4 == 0:
+            rnd.shuffle(schedule)
+        yield {"schedule": schedule, "cost_analysis": {"total_cost": round(rnd.random() * 5, 2), "currency": "EUR"}}
+
+def check_loops(cases: int, seed: int) -> int:
+    """Cases where compute_facts and the former per-slot loops disagree."""
+    from app.main import OptimizationSchedule
+    from benchmarks.bench_facts import baseline, vectorized
+    bad = 0
+    for k, p in enumerate(payloads(cases, seed)):
+        payload = OptimizationSchedule.model_validate(p)
+        if vectorized(payload) != baseline(payload, payload.matrix().slot_seconds() / 3600):
+            bad += 1
+            print(f"case {k}: facts differ from the per-slot loops")
+    return bad
+
+def dump_prompts(tree: str, out: str, cases: int, seed: int) -> None:
+    """Prompts /persona_report of `tree` gives the model for each payload, as JSON [[system, user], ...]."""
+    sys.path.insert(0, tree)
+    import app.main as m
+    from fastapi.testclient import TestClient
+    captured = []
+
+    def fake(system, prompt, *args, **kwargs):
+        captured.append([system, prompt])
+        return "x"
+
+    async def afake(*args, **kwargs):
+        return fake(*args, **kwargs)
+
+    for name in ("generate_text", "generate_text_async"):
+        if hasattr(m, name):
+            setattr(m, name, afake if name.endswith("async") else fake)
+    client = TestClient(m.app)
+    for p in payloads(cases, seed, PROMPT_STEPS):
+        r = client.post("/persona_report", params={"persona": "Sherlock Holmes"}, json=p)
+        r.raise_for_status()
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(captured, f, ensure_ascii=False)
+
+def prompts_of(tree: str, cases: int, seed: int) -> list:
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as f:
+        out = f.name
+    try:
+        env = dict(os.environ, LLM_CACHE_ENABLED="0")
+        subprocess.run([sys.executable, os.path.abspath(__file__), "--dump", out, "--tree", tree,
+                        "--cases", str(cases), "--seed", str(seed)], cwd=tree, env=env, check=True)
+        with open(out, encoding="utf-8") as f:
+            return json.load(f)
+    finally:
+        os.unlink(out)
+
+def check_prompts(rev: str, cases: int, seed: int) -> int:
+    """Cases whose prompts differ from those of git revision `rev`."""
+    tree = tempfile.mkdtemp(prefix="check_facts_")
+    subprocess.run(["git", "worktree", "add", "--detach", "-q", tree, rev], cwd=ROOT, check=True)
+    try:
+        theirs = prompts_of(tree, cases, seed)
+    finally:
+        subprocess.run(["git", "worktree", "remove", "--force", tree], cwd=ROOT, check=True)
+    ours = prompts_of(ROOT, cases, seed)
+    bad = 0
+    for k, (a, b) in enumerate(zip(ours, theirs)):
+        if a != b:
+            bad += 1
+            print(f"case {k}: prompt differs from {rev}")
+    return bad + abs(len(ours) - len(theirs))
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--cases", type=int, default=400)
+    ap.add_argument("--seed", type=int, default=16)
+    ap.add_argument("--against", metavar="REV", help="also compare prompts with this git revision")
+    ap.add_argument("--dump", help=argparse.SUPPRESS)
+    ap.add_argument("--tree", default=ROOT, help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.dump:
+        dump_prompts(args.tree, args.dump, args.cases, args.seed)
+        return
+    bad = check_loops(args.cases, args.seed)
+    print(f"per-slot loops: {args.cases - bad}/{args.cases} cases equal")
+    if args.against:
+        diff = check_prompts(args.against, args.cases, args.seed)
+        print(f"prompts vs {args.against}: {args.cases - diff}/{args.cases} cases byte-identical")
+        bad += diff
+    sys.exit(1 if bad else 0)
+
+if __name__ == "__main__":
+    main()
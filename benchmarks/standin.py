@@ -0,0 +1,119 @@
+"""
+Local stand-in backends used by the benchmarks (no model, no network).
+
+The LLM stand-in answers the Ollama (/api/chat), vLLM (/v1/chat/completions)
+and TGI (/generate, /generate_stream) routes with a fixed PT-PT text after an
+optional delay; streaming requests get the text word by word.
+
+The TTS stand-in answers the OpenAI speech route (/v1/audio/speech) with
+silent MP3 (ID3 tag + frames) whose length and latency grow with the input text.
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app.mp3 import silent_frames
+
+STANDIN_TEXT = (
+    "Olá! Sou Sherlock Holmes, e estou aqui para indicar os horários ideais de consumo. "
+    "A melhor hora para ligar o Electric Sauna é 20h00–22h00."
+)
+
+class _LLMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like real backends
+    disable_nagle_algorithm = True
+    delay_s = 0.0
+    token_delay_s = 0.0
+
+    def log_message(self, *args):
+        pass
+
+    def _send_json(self, obj: dict):
+        body = json.dumps(obj, ensure_ascii=False).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_stream(self, lines):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream" if self.path != "/api/chat" else "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for line in lines:
+            data = (line + "\n").encode("utf-8")
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+            if self.token_delay_s:
+                time.sleep(self.token_delay_s)
+        self.wfile.write(b"0\r\n\r\n")
+
+    def do_POST(self):
+        req = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+        if self.delay_s:
+            time.sleep(self.delay_s)
+        tokens = [w + " " for w in STANDIN_TEXT.split(" ")]
+        if self.path == "/api/chat" and req.get("stream"):
+            self._send_stream([json.dumps({"message": {"content": t}, "done": False}) for t in tokens]
+                              + [json.dumps({"done": True})])
+        elif self.path == "/v1/chat/completions" and req.get("stream"):
+            self._send_stream([f"data: {json.dumps({'choices': [{'delta': {'content': t}}]})}\n" for t in tokens]
+                              + ["data: [DONE]\n"])
+        elif self.path == "/generate_stream":
+            self._send_stream([f"data:{json.dumps({'token': {'text': t, 'special': False}})}\n" for t in tokens]
+                              + [f"data:{json.dumps({'token': {'text': '</s>', 'special': True}})}\n"])
+        elif self.path == "/api/chat":
+            self._send_json({"message": {"role": "assistant", "content": STANDIN_TEXT}, "done": True})
+        elif self.path == "/v1/chat/completions":
+            self._send_json({"choices": [{"message": {"role": "assistant", "content": STANDIN_TEXT}}]})
+        elif self.path == "/generate":
+            self._send_json({"generated_text": STANDIN_TEXT})
+        else:
+            self.send_error(404)
+
+class _TTSHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    delay_s = 0.0        # fixed latency per request
+    per_char_s = 0.0     # extra latency per input character
+    chars_per_frame = 2  # ~13 chars/s of speech
+
+    def log_message(self, *args):
+        pass
+
+    def audio_for(self, text: str, response_format: str) -> bytes:
+        frames = max(1, len(text) // self.chars_per_frame)
+        if response_format == "pcm":
+            return b"\0\0" * (frames * 1152 * 24000 // 44100)  # same duration, 24 kHz 16-bit mono
+        id3 = b"ID3\x04\x00\x00\x00\x00\x00\x00"  # empty ID3v2 tag, as many encoders emit
+        return id3 + silent_frames(frames)
+
+    def do_POST(self):
+        req = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+        if self.path != "/v1/audio/speech":
+            self.send_error(404); return
+        text = req.get("input", "")
+        time.sleep(self.delay_s + self.per_char_s * len(text))
+        body = self.audio_for(text, req.get("response_format", "mp3"))
+        self.send_response(200)
+        self.send_header("Content-Type", "audio/mpeg")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+def serve(handler_cls, delay_s: float = 0.0, **attrs):
+    """Start `handler_cls` on a free localhost port in a daemon thread. Returns (server, base_url)."""
+    handler = type(handler_cls.__name__, (handler_cls,), {"delay_s": delay_s, **attrs})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+    return server, f"http://{host}:{port}"
+
+def serve_llm(delay_s: float = 0.0, token_delay_s: float = 0.0):
+    return serve(_LLMHandler, delay_s, token_delay_s=token_delay_s)
+
+def serve_tts(delay_s: float = 0.0, per_char_s: float = 0.0):
+    """TTS stand-in; point the OpenAI client at it with OPENAI_BASE_URL=<base_url>/v1."""
+    return serve(_TTSHandler, delay_s, per_char_s=per_char_s)
@@ -1,5 +1,7 @@
 #!/usr/bin/env python3
-import argparse, json, sys, requests, datetime, pathlib
+import argparse, gzip, json, sys, requests, datetime, pathlib
+
+AUDIO_FORMATS = ("mp3", "opus", "aac", "flac", "wav", "pcm")
 
 def main():
     ap = argparse.ArgumentParser(
@@ -12,7 +14,13 @@ def main():
     ap.add_argument("--out-md", default=None, help="Save Markdown to this path")
     ap.add_argument("--out-json", default=None, help="Save raw JSON to this path")
     ap.add_argument("--audio", default=None,
-                    help="Save spoken persona report to this MP3 file (calls /persona_report_audio)")
+                    help="Save the spoken report text to this audio file (calls /persona_report_audio)")
+    ap.add_argument("--audio-format", default=None, choices=AUDIO_FORMATS,
+                    help="Audio format (default: from the --audio file extension, else mp3)")
+    ap.add_argument("--combined", action="store_true",
+                    help="Use /persona_report_full: one server-side generation returns the text and an audio URL")
+    ap.add_argument("--compress", default=None, choices=("gzip", "zstd"),
+                    help="Send the schedule compressed with this Content-Encoding (zstd needs the zstandard package)")
     ap.add_argument("--timeout", type=int, default=300, help="HTTP timeout seconds")
     args = ap.parse_args()
 
@@ -23,10 +31,32 @@ def main():
         print(f"[ERR] failed to read schedule: {e}", file=sys.stderr)
         sys.exit(2)
 
-    # call /persona_report (text)
-    text_url = args.url if not args.persona else f"{args.url}?persona={requests.utils.quote(args.persona)}"
+    base = args.url.split("/persona_report")[0].rstrip("/")  # e.g., http://localhost:8000
+    audio_format = args.audio_format
+    if audio_format is None and args.audio:
+        ext = pathlib.Path(args.audio).suffix.lower().lstrip(".")
+        audio_format = "opus" if ext == "ogg" else ext
+        if audio_format not in AUDIO_FORMATS:
+            audio_format = "mp3"
+
+    # call /persona_report (text), or /persona_report_full (text + audio URL)
+    text_url = f"{base}/persona_report_full" if args.combined else args.url
+    params = {"persona": args.persona} if args.persona else {}
+    if args.combined and audio_format:
+        params["format"] = audio_format
+    send = {"json": payload}
+    if args.compress:
+        body = json.dumps(payload, allow_nan=False).encode("utf-8")
+        if args.compress == "zstd":
+            import zstandard
+            packed = zstandard.ZstdCompressor().compress(body)
+        else:
+            packed = gzip.compress(body)
+        print(f"[ok] schedule {len(body)} bytes -> {len(packed)} bytes ({args.compress})")
+        send = {"data": packed, "headers": {"Content-Type": "application/json", "Content-Encoding": args.compress}}
     try:
-        r = requests.post(text_url, json=payload, timeout=args.timeout)
+        # requests asks for gzip responses and decompresses them itself
+        r = requests.post(text_url, params=params, timeout=args.timeout, **send)
     except Exception as e:
         print(f"[ERR] request to persona_report failed: {e}", file=sys.stderr); sys.exit(3)
 
@@ -59,14 +89,19 @@ def main():
         p.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
         print(f"[ok] saved json -> {p}")
 
-    # optional: synthesize audio via /persona_report_audio (server returns MP3)
+    # optional: synthesize audio of the text above via /persona_report_audio (server returns `audio_format`)
     if args.audio:
-        base = args.url.split("/persona_report")[0].rstrip("/")  # e.g., http://localhost:8000
-        audio_url = f"{base}/persona_report_audio"
-        if args.persona:
-            audio_url += f"?persona={requests.utils.quote(args.persona)}"
         try:
-            ar = requests.post(audio_url, json=payload, timeout=args.timeout)
+            if args.combined and data.get("audio_url"):
+                ar = requests.get(f"{base}{data['audio_url']}", timeout=args.timeout)
+            else:
+                # speak the report we got without a second LLM generation: by its id (any length), else its exact text
+                if data.get("report_id"):
+                    audio_body = {"report_id": data["report_id"]}
+                else:
+                    audio_body = {"text": text, "persona": persona}
+                ar = requests.post(f"{base}/persona_report_audio", json=audio_body,
+                                   params={"format": audio_format}, timeout=args.timeout)
         except Exception as e:
             print(f"[ERR] request to persona_report_audio failed: {e}", file=sys.stderr); sys.exit(5)
 
@@ -74,7 +109,7 @@ def main():
             print(f"[ERR] TTS API returned {ar.status_code}")
             print(ar.text); sys.exit(6)
 
-        # save bytes (MP3)
+        # save bytes (in the requested format)
         out_path = pathlib.Path(args.audio)
         out_path.parent.mkdir(parents=True, exist_ok=True)
         out_path.write_bytes(ar.content)